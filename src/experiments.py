@@ -82,6 +82,7 @@ class AllStaticButOneRandomPlacementDelaunayTriangulationDistanceLimitedCommunic
             triangulation_precision=1.0,  # 1 meter
             communication_frequency=0.5,  # 500 milliseconds
             communication_radius=10.0,  # 10 meters
+            **kwargs,  # other simulation parameters
     ):
         super().__init__(
             dim=dim, arena=arena,
@@ -89,6 +90,7 @@ class AllStaticButOneRandomPlacementDelaunayTriangulationDistanceLimitedCommunic
             agents_speed=agents_speed,
             triangulation_precision=triangulation_precision,
             communication_frequency=communication_frequency,
+            **kwargs,
         )
 
         self.communication_radius = communication_radius
@@ -136,6 +138,7 @@ class AllStaticRectanglePlacementExperiment(Simulation):
             triangulation_precision=1.0,  # 1 meter
             communication_frequency=0.5,  # 500 milliseconds
             communication_radius=10.0,  # 10 meters
+            **kwargs,  # other simulation parameters
     ):
         super().__init__(
             dim=dim, arena=arena,
@@ -143,6 +146,7 @@ class AllStaticRectanglePlacementExperiment(Simulation):
             agents_speed=agents_speed,
             triangulation_precision=triangulation_precision,
             communication_frequency=communication_frequency,
+            **kwargs,
         )
 
         self.arena = RectangleArena(xlim=50, ylim=50, width=50, height=50)
@@ -187,6 +191,7 @@ class OneAwayFromOther(Simulation):
             triangulation_precision=1.0,  # 1 meter
             communication_frequency=0.5,  # 500 milliseconds
             communication_radius=20.0,  # 10 meters
+            **kwargs,  # other simulation parameters
     ):
         super().__init__(
             dim=5, arena=arena,
@@ -194,6 +199,7 @@ class OneAwayFromOther(Simulation):
             agents_speed=agents_speed,
             triangulation_precision=triangulation_precision,
             communication_frequency=communication_frequency,
+            **kwargs,
         )
 
         self.arena = RectangleArena(xlim=50, ylim=50, width=50, height=50)
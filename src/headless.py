@@ -0,0 +1,33 @@
+from src.experiments import TestExperiment
+from src.simulation.simulation import Simulation
+
+
+def run_headless(experiment: type[Simulation], duration, seed=None, **parameters):
+    """
+    Run an experiment without GUI, faster than real time
+    :param experiment: Simulation subclass to run (e.g. TestExperiment, OneAwayFromOther)
+    :param duration: simulated time to run (in seconds)
+    :param seed: seed of the random generators, for reproducible runs
+    :param parameters: parameters given to the experiment constructor
+    :return: metrics collected during the run
+    """
+    return experiment(**parameters).run(duration, seed=seed)
+
+
+if __name__ == '__main__':
+    metrics = run_headless(
+        TestExperiment,
+        duration=10,  # simulated time (in seconds)
+        seed=0,
+        dim=30,  # number of agents
+        refresh_rate=0.01,  # refresh rate of the simulation (in seconds)
+        agents_speed=0.5,  # speed of the agents (in meters per second)
+        triangulation_precision=0.1,  # precision of the triangulation (in meters)
+        triangulation_frequency=0.01,  # frequency of the triangulation (in seconds)
+        communication_frequency=0.01,  # frequency of the communication (in seconds)
+    )
+
+    print(
+        f"{metrics.experiment}: {metrics.simulated_time:.2f}s simulated in {metrics.wall_time:.2f}s "
+        f"({metrics.speedup:.1f}x), {metrics.messages} messages, {metrics.triangulations} triangulations"
+    )
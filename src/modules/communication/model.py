@@ -1,5 +1,8 @@
 import numpy as np
 
+from src.modules.storage.model import DataTypes, DistanceRow, payload_size
+from src.modules.storage.snapshot import PayloadSnapshot
+
 
 class Communication:
     def __init__(self, agent_id, refresh_rate=0.01, communication_frequency=0.5):
@@ -7,13 +10,112 @@ class Communication:
         self.refresh_rate = refresh_rate
         self.communication_chances = self.refresh_rate / communication_frequency
 
-        self.data = dict()
+        self.snapshot = PayloadSnapshot()  # information to send, published by the agent
+
+        # Shared indices over the swarm, given by the simulation
+        self.neighbor_index = None
+        self.delaunay_cache = None
+        self.partner_sampler = None
+
+        # Delta mode: only send to each peer what changed since the last message it received
+        self.delta = False
+        self.last_sent = dict()  # by receiver id: (clock of the sender, triangulation sent)
+
+        # Wire format of the messages (see `PayloadCodec`), information is passed by reference when None
+        self.codec = None
+
+        # Statistics of the information sent
+        self.sent_messages = 0
+        self.sent_entries = 0
+        self.sent_bytes = 0  # only counted with a codec
+
+    @property
+    def data(self):
+        """Read-only view of the last information published"""
+        return self.snapshot.payload
+
+    @data.setter
+    def data(self, information):
+        self.snapshot.publish(information)
+
+    @property
+    def age(self):
+        """Age of the storage when the last information was published"""
+        return self.snapshot.age
+
+    def publish(self, information, age=None):
+        """Replace the information to send by a read-only snapshot of the given one"""
+        self.snapshot.publish(information, age)
+
+    def select_partner(self, other_agents: list, context: np.ndarray):
+        """:return: index of the agent to communicate with in other_agents, -1 if there is none"""
+        raise NotImplementedError("Communication does not implement a default select_partner")
+
+    @classmethod
+    def initiates(cls, chances: np.ndarray):
+        """
+        Batched decision of communications of this type to start an exchange, as `receive_information` would.
+        Draws the communication chances by default, types communicating at each step start all the exchanges.
+        :param chances: communication chances of the agents
+        :return: mask of the agents starting an exchange
+        """
+        return np.random.random(len(chances)) < chances
+
+    @classmethod
+    def select_partners(cls, communications: list, other_agents: list, context: np.ndarray):
+        """Batched version of `select_partner`, for communications of this type"""
+        return np.array(
+            [communication.select_partner(other_agents, context) for communication in communications], dtype=int
+        )
 
     def receive_information(self, other_agents: list, context: np.ndarray):
         raise NotImplementedError("Communication does not implement a default receive_information")
 
-    def send_information(self):
-        raise NotImplementedError("Communication does not implement a default send_information")
+    def _delta(self, receiver_id, information):
+        """
+        Only keep the distances measured since the last message sent to the receiver, and drop the triangulation
+        if it did not change. Requires versioned distances (see `ArrayDistanceStorage`), sent in full otherwise.
+        """
+        clock = information.get(DataTypes.clock.value)
+        distances = information.get(DataTypes.distance.value)
+        triangulation = information.get(DataTypes.triangulation.value)
+
+        if clock is None or not isinstance(distances, DistanceRow) or distances.versions is None:
+            return information
+
+        last_clock, last_triangulation = self.last_sent.get(receiver_id, (0, None))
+        self.last_sent[receiver_id] = (clock, triangulation)
+
+        information = dict(information)
+
+        changed = distances.versions > last_clock
+        if not np.all(changed):
+            information[DataTypes.distance.value] = DistanceRow(
+                distances.ids[changed], distances.distances[changed], distances.versions[changed]
+            )
+
+        if triangulation is not None and triangulation is last_triangulation:
+            del information[DataTypes.triangulation.value]
+
+        return information
+
+    def send_information(self, receiver_id=None):
+        """:param receiver_id: id of the agent receiving the information, needed by the delta mode"""
+        information = self.data
+
+        if self.delta and receiver_id is not None:
+            information = self._delta(receiver_id, information)
+
+        self.sent_messages += 1
+        self.sent_entries += payload_size(information)
+
+        if self.codec is not None:
+            # The receiver gets the information as decoded from the wire, quantization included
+            message = self.codec.encode(self.agent_id, information, self.age)
+            self.sent_bytes += len(message)
+            _, _, information = self.codec.decode(message)
+
+        return information
 
 
 class FakeCommunication(Communication):
@@ -24,8 +126,11 @@ class FakeCommunication(Communication):
             communication_frequency=communication_frequency
         )
 
+    def select_partner(self, other_agents: list, context: np.ndarray):
+        return -1
+
     def receive_information(self, other_agents: list, context: np.ndarray):
         return -1, None, None
 
-    def send_information(self):
+    def send_information(self, receiver_id=None):
         pass
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+class CommunicationScheduler:
+    """
+    Centralized scheduling of the communication of a swarm, replacing the agents pulling information one by one.
+    At each tick, the agents starting an exchange and their partners are chosen at once by communication type,
+    as each agent would on its own (see `Communication.initiates`), then the messages are delivered in a single phase.
+    In symmetric mode, both agents of an exchange receive the information of the other one in the same event.
+    """
+
+    def __init__(self, agents: list, symmetric=True):
+        self.agents = agents
+        self.symmetric = symmetric
+
+        self.chances = np.array([agent.communication.communication_chances for agent in agents], dtype=float)
+
+        # Agents grouped by type of communication, as partners are chosen in batch for each type
+        types = []
+        self.kinds = np.zeros(len(agents), dtype=int)
+        for row, agent in enumerate(agents):
+            kind = type(agent.communication)
+            if kind not in types:
+                types.append(kind)
+            self.kinds[row] = types.index(kind)
+        self.types = types
+
+        # Statistics of the exchanges
+        self.events = 0
+        self.messages = 0
+
+    def select_pairs(self, rows: np.ndarray, context: np.ndarray):
+        """
+        :param rows: agents allowed to communicate
+        :return: agents starting an exchange and their partners
+        """
+        kinds = self.kinds[rows]
+        initiating = np.zeros(len(rows), dtype=bool)
+
+        for kind, communication_type in enumerate(self.types):
+            selected = kinds == kind
+
+            if np.any(selected):
+                initiating[selected] = communication_type.initiates(self.chances[rows[selected]])
+
+        initiators = rows[initiating]
+        partners = np.full(len(initiators), -1, dtype=int)
+
+        for kind, communication_type in enumerate(self.types):
+            selected = np.flatnonzero(self.kinds[initiators] == kind)
+
+            if len(selected) > 0:
+                partners[selected] = communication_type.select_partners(
+                    [self.agents[row].communication for row in initiators[selected]], self.agents, context
+                )
+
+        valid = (partners >= 0) & (partners != initiators)
+
+        return initiators[valid], partners[valid]
+
+    def deliver(self, initiators: np.ndarray, partners: np.ndarray, context: np.ndarray):
+        """:return: number of messages delivered"""
+        distances = np.maximum(context[initiators, partners], context[partners, initiators]).tolist()
+
+        pairs = list(zip(initiators.tolist(), partners.tolist(), distances))
+
+        # Every message of the tick is prepared before any delivery, from the same state of the swarm
+        information = []
+        for initiator, partner, _ in pairs:
+            agent, other_agent = self.agents[initiator], self.agents[partner]
+
+            information.append((
+                other_agent.communication.send_information(agent.id),
+                agent.communication.send_information(other_agent.id) if self.symmetric else None,
+            ))
+
+        messages = 0
+        for (initiator, partner, distance), (received, sent) in zip(pairs, information):
+            agent, other_agent = self.agents[initiator], self.agents[partner]
+
+            agent.receive(other_agent.id, distance, received)
+            messages += 1
+
+            if self.symmetric:
+                other_agent.receive(agent.id, distance, sent)
+                messages += 1
+
+        self.events += len(initiators)
+        self.messages += messages
+
+        return messages
+
+    def step(self, rows: np.ndarray, context: np.ndarray):
+        return self.deliver(*self.select_pairs(rows, context), context)
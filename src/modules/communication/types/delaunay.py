@@ -8,7 +8,14 @@ from src.modules.communication.model import Communication
 
 class DelaunayNetworkCommunication(Communication):
     """Communication that focus on the neighbours of an agent, using the Delaunay triangulation."""
-    def receive_information(self, other_agents: list, context: np.ndarray):
+    @classmethod
+    def initiates(cls, chances: np.ndarray):
+        return np.ones(len(chances), dtype=bool)
+
+    def _get_neighbours(self, other_agents: list):
+        if self.delaunay_cache is not None:
+            return self.delaunay_cache.neighbours(self.agent_id).tolist()
+
         x, y = [], []
         for i, agent in enumerate(other_agents):
             x.append(agent.x)
@@ -26,20 +33,30 @@ class DelaunayNetworkCommunication(Communication):
             elif edge[1] == self.agent_id:
                 neighbours.append(edge[0])
 
+        return neighbours
+
+    def select_partner(self, other_agents: list, context: np.ndarray):
+        neighbours = self._get_neighbours(other_agents)
+
         if len(neighbours) == 0:
-            return -1, None, None
+            return -1
+
+        index = neighbours[round(random.uniform(0, 1) * (len(neighbours) - 1))]
 
-        index = round(random.uniform(0, 1) * (len(neighbours) - 1))
+        if other_agents[index].id == self.agent_id:
+            return -1
+
+        return index
+
+    def receive_information(self, other_agents: list, context: np.ndarray):
+        index = self.select_partner(other_agents, context)
 
         if index < 0:
             return -1, None, None
 
         other_agent = other_agents[index]
 
-        if other_agent.id == self.agent_id:
-            return -1, None, None
-
-        information = other_agent.communication.send_information()
+        information = other_agent.communication.send_information(self.agent_id)
 
         if self.agent_id < other_agent.id:
             distance = context[self.agent_id, other_agent.id]
@@ -47,6 +64,3 @@ class DelaunayNetworkCommunication(Communication):
             distance = context[other_agent.id, self.agent_id]
 
         return other_agent.id, distance, information
-
-    def send_information(self):
-        return self.data
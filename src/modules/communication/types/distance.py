@@ -12,27 +12,48 @@ class AlmostAlwaysClosestCommunication(Communication):
             communication_frequency=communication_frequency,
         )
 
+    @classmethod
+    def initiates(cls, chances: np.ndarray):
+        return np.ones(len(chances), dtype=bool)
+
+    def select_partner(self, other_agents: list, context: np.ndarray):
+        if self.partner_sampler is not None:
+            return self.partner_sampler.draw(self.agent_id)
+
+        # Choose at random with weights decreasing with distance
+        ids = np.array([agent.id for agent in other_agents], dtype=int)
+        distances = np.maximum(context[self.agent_id, ids], context[ids, self.agent_id])
+
+        weights = np.zeros(len(ids), dtype=float)
+        others = ids != self.agent_id
+        weights[others] = 1 / np.maximum(distances[others], 1e-6)
+
+        total = np.sum(weights)
+        if total == 0:
+            return -1
+
+        return int(np.searchsorted(np.cumsum(weights) / total, random.random(), side="right"))
+
+    @classmethod
+    def select_partners(cls, communications: list, other_agents: list, context: np.ndarray):
+        sampler = communications[0].partner_sampler if communications else None
+
+        if sampler is None or any(communication.partner_sampler is not sampler for communication in communications):
+            return super().select_partners(communications, other_agents, context)
+
+        return sampler.draw_all([communication.agent_id for communication in communications])
+
     def receive_information(self, other_agents: list, context: np.ndarray):
         if len(other_agents) == 0:
             return -1, None, None
 
-        # Choose at random with weights decreasing with distance
-        weights = []
-        for agent in other_agents:
-            if self.agent_id < agent.id:
-                weights.append(1 / context[self.agent_id, agent.id])
-            elif agent.id < self.agent_id:
-                weights.append(1 / context[agent.id, self.agent_id])
-            else:
-                weights.append(0)
-
-        weights = np.array(weights)
-        weights /= np.sum(weights)
+        index = self.select_partner(other_agents, context)
+        if index < 0:
+            return -1, None, None
 
-        index = np.random.choice(len(other_agents), p=weights)
         other_agent = other_agents[index]
 
-        information = other_agent.communication.send_information()
+        information = other_agent.communication.send_information(self.agent_id)
 
         if self.agent_id < other_agent.id:
             distance = context[self.agent_id, other_agent.id]
@@ -52,23 +73,42 @@ class DistanceLimitedCommunication(Communication):
 
         self.radius = radius
 
-    def receive_information(self, other_agents: list, context: np.ndarray):
-        in_range_agents = []
-        for agent in other_agents:
+    @classmethod
+    def initiates(cls, chances: np.ndarray):
+        return np.ones(len(chances), dtype=bool)
+
+    def _get_in_range_indices(self, other_agents: list, context: np.ndarray):
+        if self.neighbor_index is not None:
+            return self.neighbor_index.within(self.agent_id, self.radius).tolist()
+
+        in_range_indices = []
+        for index, agent in enumerate(other_agents):
             if self.agent_id < agent.id:
                 if context[self.agent_id, agent.id] <= self.radius:
-                    in_range_agents.append(agent)
+                    in_range_indices.append(index)
             elif agent.id < self.agent_id:
                 if context[agent.id, self.agent_id] <= self.radius:
-                    in_range_agents.append(agent)
+                    in_range_indices.append(index)
+
+        return in_range_indices
+
+    def select_partner(self, other_agents: list, context: np.ndarray):
+        in_range_indices = self._get_in_range_indices(other_agents, context)
 
-        if len(in_range_agents) == 0:
+        if len(in_range_indices) == 0:
+            return -1
+
+        return in_range_indices[round(random.uniform(0, 1) * (len(in_range_indices) - 1))]
+
+    def receive_information(self, other_agents: list, context: np.ndarray):
+        index = self.select_partner(other_agents, context)
+
+        if index < 0:
             return -1, None, None
 
-        index = round(random.uniform(0, 1) * (len(in_range_agents) - 1))
-        other_agent = in_range_agents[index]
+        other_agent = other_agents[index]
 
-        information = other_agent.communication.send_information()
+        information = other_agent.communication.send_information(self.agent_id)
 
         if self.agent_id < other_agent.id:
             distance = context[self.agent_id, other_agent.id]
@@ -76,6 +116,3 @@ class DistanceLimitedCommunication(Communication):
             distance = context[other_agent.id, self.agent_id]
 
         return other_agent.id, distance, information
-
-    def send_information(self):
-        return self.data
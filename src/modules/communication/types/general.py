@@ -6,23 +6,37 @@ from src.modules.communication.model import Communication
 
 
 class GlobalCommunication(Communication):
+    def select_partner(self, other_agents: list, context: np.ndarray):
+        index = round(random.uniform(0, 1) * (len(other_agents) - 1))
+
+        if other_agents[index].id == self.agent_id:
+            return -1
+
+        return index
+
+    @classmethod
+    def select_partners(cls, communications: list, other_agents: list, context: np.ndarray):
+        # Agents are stored by id, as in the context
+        ids = np.array([communication.agent_id for communication in communications], dtype=int)
+        indices = np.rint(np.random.random(len(ids)) * (len(other_agents) - 1)).astype(int)
+
+        return np.where(indices == ids, -1, indices)
+
     def receive_information(self, other_agents: list, context: np.ndarray):
         if random.random() > self.communication_chances:
             return -1, None, None  # Drop the information, did not communicate
 
-        index = round(random.uniform(0, 1) * (len(other_agents) - 1))
-        other_agent = other_agents[index]
+        index = self.select_partner(other_agents, context)
 
-        if other_agent.id == self.agent_id:
+        if index < 0:
             return -1, None, None  # Drop the information, did not communicate
 
-        information = other_agent.communication.send_information()
+        other_agent = other_agents[index]
+
+        information = other_agent.communication.send_information(self.agent_id)
         if self.agent_id < other_agent.id:
             distance = context[self.agent_id, other_agent.id]
         else:
             distance = context[other_agent.id, self.agent_id]
 
         return other_agent.id, distance, information
-
-    def send_information(self):
-        return self.data
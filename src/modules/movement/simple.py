@@ -1,6 +1,8 @@
 import random
 import math
 
+import numpy as np
+
 
 def walk_forward(self):
     # Make the robot walk forward
@@ -18,3 +20,28 @@ def random_walk(self):
 
     self.x += self.speed * self.dx
     self.y += self.speed * self.dy
+
+
+def walk_forward_batch(state, rows):
+    # Make the robots walk forward
+    state.positions[rows] += state.speeds[rows, np.newaxis] * state.headings[rows]
+
+
+def random_walk_batch(state, rows):
+    # Simulate random movement
+    turning = rows[np.random.random(len(rows)) < 0.001]
+
+    if len(turning) > 0:
+        state.angles[turning] += np.random.uniform(-60, 60, len(turning))
+
+        state.headings[turning, 0] = np.cos(state.angles[turning])
+        state.headings[turning, 1] = np.sin(state.angles[turning])
+
+    state.positions[rows] += state.speeds[rows, np.newaxis] * state.headings[rows]
+
+
+# Batched version of the movements, applied to the rows of a swarm state at once
+BATCHED_MOVEMENTS = {
+    walk_forward: walk_forward_batch,
+    random_walk: random_walk_batch,
+}
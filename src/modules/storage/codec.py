@@ -0,0 +1,187 @@
+import struct
+
+import numpy as np
+
+from src.modules.storage.model import DataTypes, DistanceRow
+
+
+class PayloadCodec:
+    """
+    Binary wire format of the information sent by the storages, to model the size of the radio messages
+    (or to send them between processes). All the values are little-endian.
+
+    Header: sender id (uint16), sender age (float32), clock (uint32), flags (uint8),
+            number of distances (uint16), number of triangulation points (uint16)
+    Then, in this order and only if flagged:
+        - distances: ids (uint16), distances quantized by `distance_scale` (uint16), versions (uint32)
+        - relative ages of the distances (float16)
+        - triangulation: ids (uint16), coordinates quantized by `position_scale` (2 x int16)
+        - relative age of the triangulation (float32)
+
+    With the default scales, distances are kept up to 655 meters and positions within 327 meters of the agent,
+    both with a centimeter precision.
+    """
+
+    HEADER = struct.Struct("<HfIBHH")
+
+    # Flags of the header, telling which sections follow
+    DISTANCES = 1
+    VERSIONS = 2
+    DISTANCES_AGES = 4
+    TRIANGULATION = 8
+    TRIANGULATION_AGE = 16
+    CLOCK = 32
+
+    DISTANCE_DTYPE = np.dtype([("id", "<u2"), ("distance", "<u2")])
+    POINT_DTYPE = np.dtype([("id", "<u2"), ("x", "<i2"), ("y", "<i2")])
+
+    SUPPORTED_TYPES = {
+        DataTypes.distance.value, DataTypes.triangulation.value, DataTypes.age.value, DataTypes.clock.value
+    }
+
+    def __init__(self, distance_scale=0.01, position_scale=0.01):
+        self.distance_scale = distance_scale  # in meters per unit
+        self.position_scale = position_scale  # in meters per unit
+
+    def _quantize(self, values, scale, dtype):
+        limits = np.iinfo(dtype)
+        return np.clip(np.rint(np.asarray(values, dtype=float) / scale), limits.min, limits.max).astype(dtype)
+
+    def encode(self, sender_id, information, age=0.0):
+        """
+        :param sender_id: id of the agent sending the information
+        :param information: payload of a storage (see `DataStorage.get_data_to_send`)
+        :param age: age of the storage of the sender
+        :return: bytes of the message
+        """
+        unsupported = set(information) - self.SUPPORTED_TYPES
+        if unsupported:
+            raise ValueError(f"PayloadCodec cannot encode the data types {sorted(unsupported)}")
+
+        flags = 0
+        sections = []
+
+        clock = information.get(DataTypes.clock.value)
+        if clock is not None:
+            flags |= self.CLOCK
+
+        ages = information.get(DataTypes.age.value, {})
+
+        distances = information.get(DataTypes.distance.value)
+        n_distances = 0
+        if distances is not None:
+            flags |= self.DISTANCES
+
+            if isinstance(distances, DistanceRow):
+                ids, values, versions = distances.ids, distances.distances, distances.versions
+            else:
+                ids = np.fromiter(distances.keys(), dtype=int, count=len(distances))
+                values = np.fromiter(distances.values(), dtype=float, count=len(distances))
+                versions = None
+
+            n_distances = len(ids)
+
+            entries = np.empty(n_distances, dtype=self.DISTANCE_DTYPE)
+            entries["id"] = ids
+            entries["distance"] = self._quantize(values, self.distance_scale, np.uint16)
+            sections.append(entries.tobytes())
+
+            if versions is not None:
+                flags |= self.VERSIONS
+                sections.append(versions.astype("<u4").tobytes())
+
+            if DataTypes.distance.value in ages:
+                flags |= self.DISTANCES_AGES
+                distances_ages = ages[DataTypes.distance.value]
+                sections.append(np.array([distances_ages.get(i, 0.0) for i in ids.tolist()], dtype="<f2").tobytes())
+
+        triangulation = information.get(DataTypes.triangulation.value)
+        n_points = 0
+        if triangulation is not None:
+            flags |= self.TRIANGULATION
+            n_points = len(triangulation)
+
+            points = np.empty(n_points, dtype=self.POINT_DTYPE)
+            points["id"] = np.fromiter(triangulation.keys(), dtype=int, count=n_points)
+            coordinates = np.array(list(triangulation.values()), dtype=float).reshape(n_points, 2)
+            points["x"] = self._quantize(coordinates[:, 0], self.position_scale, np.int16)
+            points["y"] = self._quantize(coordinates[:, 1], self.position_scale, np.int16)
+            sections.append(points.tobytes())
+
+            if ages.get(DataTypes.triangulation.value) is not None:
+                flags |= self.TRIANGULATION_AGE
+                sections.append(struct.pack("<f", ages[DataTypes.triangulation.value]))
+
+        header = self.HEADER.pack(sender_id, age, clock or 0, flags, n_distances, n_points)
+
+        return header + b"".join(sections)
+
+    def decode(self, message):
+        """
+        :param message: bytes produced by `encode`
+        :return: sender id, age of the storage of the sender and the information sent
+        """
+        sender_id, age, clock, flags, n_distances, n_points = self.HEADER.unpack_from(message)
+        offset = self.HEADER.size
+
+        information = dict()
+        ages = dict()
+
+        if flags & self.DISTANCES:
+            entries = np.frombuffer(message, dtype=self.DISTANCE_DTYPE, count=n_distances, offset=offset)
+            offset += entries.nbytes
+
+            versions = None
+            if flags & self.VERSIONS:
+                versions = np.frombuffer(message, dtype="<u4", count=n_distances, offset=offset)
+                offset += versions.nbytes
+
+            ids = entries["id"].astype(int)
+            information[DataTypes.distance.value] = DistanceRow(
+                ids, entries["distance"] * np.float32(self.distance_scale), versions
+            )
+
+            if flags & self.DISTANCES_AGES:
+                distances_ages = np.frombuffer(message, dtype="<f2", count=n_distances, offset=offset)
+                offset += distances_ages.nbytes
+                ages[DataTypes.distance.value] = dict(zip(ids.tolist(), distances_ages.astype(float).tolist()))
+
+        if flags & self.TRIANGULATION:
+            points = np.frombuffer(message, dtype=self.POINT_DTYPE, count=n_points, offset=offset)
+            offset += points.nbytes
+
+            information[DataTypes.triangulation.value] = {
+                i: [x * self.position_scale, y * self.position_scale]
+                for i, x, y in zip(points["id"].tolist(), points["x"].tolist(), points["y"].tolist())
+            }
+
+            if flags & self.TRIANGULATION_AGE:
+                ages[DataTypes.triangulation.value] = struct.unpack_from("<f", message, offset)[0]
+                offset += 4
+
+        if ages:
+            information[DataTypes.age.value] = ages
+        if flags & self.CLOCK:
+            information[DataTypes.clock.value] = clock
+
+        return sender_id, age, information
+
+    def size(self, information):
+        """:return: size (in bytes) of the message carrying the given information"""
+        size = self.HEADER.size
+
+        distances = information.get(DataTypes.distance.value)
+        if distances is not None:
+            size += len(distances) * self.DISTANCE_DTYPE.itemsize
+            if getattr(distances, "versions", None) is not None:
+                size += len(distances) * 4
+            if DataTypes.distance.value in information.get(DataTypes.age.value, {}):
+                size += len(distances) * 2
+
+        triangulation = information.get(DataTypes.triangulation.value)
+        if triangulation is not None:
+            size += len(triangulation) * self.POINT_DTYPE.itemsize
+            if information.get(DataTypes.age.value, {}).get(DataTypes.triangulation.value) is not None:
+                size += 4
+
+        return size
@@ -0,0 +1,25 @@
+import heapq
+import itertools
+
+
+class ExpiryIndex:
+    """
+    Min-heap of the expiry times of stored entries, so that outdated entries are found in O(log n) each.
+    Refreshing an entry pushes it again: the older heap items of an entry are skipped when popped,
+    it is up to the storage to verify whether a popped entry is still outdated.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.counter = itertools.count()  # tie-breaker, keys are never compared
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, key, expires_at):
+        heapq.heappush(self.heap, (expires_at, next(self.counter), key))
+
+    def pop_expired(self, now):
+        """:return: keys of the entries which expiry time is over"""
+        while self.heap and self.heap[0][0] < now:
+            yield heapq.heappop(self.heap)[2]
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class AgentIndex:
+    """
+    Dense indices of the agents met, in order of appearance, for their data to be kept in preallocated arrays.
+    The capacity of the arrays doubles when full, their owner being asked to grow them before new agents are indexed.
+    """
+
+    def __init__(self, grow=None, capacity=0):
+        """
+        :param grow: called with the new capacity, to grow the arrays indexed (their first `size` entries being used)
+        :param capacity: initial capacity of the arrays indexed
+        """
+        self.grow = grow
+
+        self.size = 0
+        self.capacity = capacity
+        self.ids = np.full(capacity, -1, dtype=int)  # agent id of each index
+        self.index_of = np.full(0, -1, dtype=int)  # index of each agent id, -1 when unknown
+
+    def get(self, ids):
+        """:return: indices of the given agents, -1 for the ones not known"""
+        ids = np.asarray(ids, dtype=int)
+
+        indices = np.full(len(ids), -1, dtype=int)
+        known = ids < len(self.index_of)
+        indices[known] = self.index_of[ids[known]]
+
+        return indices
+
+    def register(self, ids):
+        """:return: indices of the given agents, registering the ones not known yet"""
+        ids = np.asarray(ids, dtype=int)
+        if len(ids) == 0:
+            return np.zeros(0, dtype=int)
+
+        if ids.max() >= len(self.index_of):
+            index_of = np.full(max(2 * len(self.index_of), ids.max() + 1), -1, dtype=int)
+            index_of[:len(self.index_of)] = self.index_of
+            self.index_of = index_of
+
+        indices = self.index_of[ids]
+
+        unknown = indices < 0
+        if np.any(unknown):
+            # New agents, in order of appearance
+            new_ids, first = np.unique(ids[unknown], return_index=True)
+            new_ids = new_ids[np.argsort(first)]
+
+            if self.size + len(new_ids) > self.capacity:
+                self._grow(max(2 * self.capacity, self.size + len(new_ids)))
+
+            new_indices = np.arange(self.size, self.size + len(new_ids))
+            self.ids[new_indices] = new_ids
+            self.index_of[new_ids] = new_indices
+            self.size += len(new_ids)
+
+            indices = self.index_of[ids]
+
+        return indices
+
+    def _grow(self, capacity):
+        if self.grow is not None:
+            self.grow(capacity)
+
+        ids = np.full(capacity, -1, dtype=int)
+        ids[:self.size] = self.ids[:self.size]
+        self.ids = ids
+        self.capacity = capacity
@@ -1,6 +1,11 @@
+from collections.abc import Mapping
 from enum import Enum
 from abc import ABC, abstractmethod
 
+import numpy as np
+
+from src.modules.storage.expiry import ExpiryIndex
+
 
 class DataTypes(Enum):
     information: str = "information"
@@ -8,6 +13,67 @@ class DataTypes(Enum):
     distance: str = "distances"
     triangulation: str = "triangulation"
     custom: str = "custom"
+    age: str = "age"  # relative age of the data sent, from the point of view of the sender
+    clock: str = "clock"  # logical clock of the sender, versioning the data sent
+
+
+# Data types describing the other ones, not stored as such
+METADATA_TYPES = {DataTypes.age.value, DataTypes.clock.value}
+
+
+class DistanceRow(Mapping):
+    """
+    Distances from an agent to other agents, stored as arrays (ids, distances) for vectorized consumers,
+    but still readable as the usual {agent_id: distance} dictionary.
+    Versions, when given, are the logical timestamps of the measurements, a higher version being fresher.
+    Distances keep the floating point precision they are given with (float32 for the array storages).
+    """
+
+    def __init__(self, ids, distances, versions=None):
+        self.ids = np.asarray(ids, dtype=int)
+        self.distances = np.asarray(distances)
+        if self.distances.dtype.kind != "f":
+            self.distances = self.distances.astype(float)
+        self.versions = None if versions is None else np.asarray(versions, dtype=np.uint32)
+
+        self._lookup = None
+
+    def __getitem__(self, agent_id):
+        if self._lookup is None:
+            self._lookup = dict(zip(self.ids.tolist(), self.distances.tolist()))
+
+        return self._lookup[agent_id]
+
+    def __iter__(self):
+        return iter(self.ids.tolist())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def items(self):
+        return zip(self.ids.tolist(), self.distances.tolist())
+
+    def __repr__(self):
+        return str(dict(self.items()))
+
+
+def as_arrays(distances, dtype=np.float32):
+    """:return: ids, distances and versions (None if not versioned) of the given distances, as arrays"""
+    if isinstance(distances, DistanceRow):
+        return distances.ids, distances.distances, distances.versions
+
+    ids = np.fromiter(distances.keys(), dtype=int, count=len(distances))
+    values = np.fromiter(distances.values(), dtype=dtype, count=len(distances))
+
+    return ids, values, None
+
+
+def payload_size(information):
+    """:return: number of entries in the information sent, scalars counting for one"""
+    if information is None:
+        return 0
+
+    return sum(len(value) if isinstance(value, Mapping) else 1 for value in information.values())
 
 
 class DataStorage(ABC):
@@ -41,7 +107,7 @@ class DataStorage(ABC):
 
     def _compute_data_age(self, agent_id, data_type):
         data_age = None
-        if data_arrival_time := self._get_data(agent_id, data_type, age=True) is not None:
+        if (data_arrival_time := self._get_data(agent_id, data_type, age=True)) is not None:
             data_age = self.age - data_arrival_time
 
         return data_age
@@ -84,17 +150,8 @@ class DataStorage(ABC):
                 data = data[element]
             else:
                 return None
-            return data
 
-    # def _get_all_distances_not_outdated(self):
-    #     for agent_id in self.data[DataTypes.distance.value]:
-    #         if not self._is_outdated(agent_id, DataTypes.distance.value):
-    #             yield agent_id, self._get_data(agent_id, DataTypes.distance.value)
-
-    # def _get_all_triangulation_not_outdated(self):
-    #     for agent_id in self.data[DataTypes.triangulation]:
-    #         if not self._is_outdated(agent_id, DataTypes.triangulation):
-    #             yield agent_id, self._get_data(agent_id, DataTypes.triangulation)
+        return data
 
     @abstractmethod
     def get_data_to_send(self):
@@ -130,6 +187,9 @@ class DataStorage(ABC):
         :param information: data to store
         """
         for data_type in information:
+            if data_type in METADATA_TYPES:
+                continue
+
             self._set_data(agent_id, data_type, information[data_type])
 
     def __str__(self):
@@ -142,6 +202,122 @@ class DataStorage(ABC):
         return len(self.data)
 
 
+class TTLDataStorage(DataStorage, ABC):
+    """
+    Storage dropping the data older than its time to live.
+    Distances are aged entry by entry, other types of data as a whole, by agent.
+    Expiry times are kept in a min-heap, so that only the outdated entries are visited when expiring,
+    and the ages are exchanged as relative ages so that relayed data keeps its real age.
+    """
+
+    def __init__(self, agent_id, time_to_live=10, clock_frequency=0.01):
+        super().__init__(
+            agent_id=agent_id,
+            time_to_live=time_to_live,
+            clock_frequency=clock_frequency,
+        )
+
+        self.data_age = {
+            DataTypes.distance.value: {
+                self.agent_id: {}
+            },
+        }
+        self.expiry = ExpiryIndex()
+
+    def _get_arrival_time(self, key):
+        if key[0] == DataTypes.distance.value:
+            return self.data_age[key[0]].get(key[1], {}).get(key[2])
+
+        return self.data_age.get(key[0], {}).get(key[1])
+
+    def _remove(self, key):
+        if key[0] == DataTypes.distance.value:
+            del self.data[key[0]][key[1]][key[2]]
+            del self.data_age[key[0]][key[1]][key[2]]
+        else:
+            del self.data[key[0]][key[1]]
+            del self.data_age[key[0]][key[1]]
+
+    def _is_expired(self, arrival_time):
+        """Same test as the expiry index, on the expiry time pushed, so that both always agree"""
+        return arrival_time + self.time_to_live < self.age
+
+    def expire(self):
+        """Drop the outdated data"""
+        for key in self.expiry.pop_expired(self.age):
+            arrival_time = self._get_arrival_time(key)
+
+            # Skip the entries removed or refreshed since then
+            if arrival_time is not None and self._is_expired(arrival_time):
+                self._remove(key)
+
+    def _set_distances(self, agent_id, distances, arrival_times):
+        data = self.data[DataTypes.distance.value].setdefault(agent_id, {})
+        data_age = self.data_age[DataTypes.distance.value].setdefault(agent_id, {})
+
+        for other_agent_id, distance in distances.items():
+            arrival_time = arrival_times.get(other_agent_id, self.age)
+
+            if self._is_expired(arrival_time):
+                continue  # already outdated
+
+            data[other_agent_id] = distance
+            data_age[other_agent_id] = arrival_time
+            self.expiry.push((DataTypes.distance.value, agent_id, other_agent_id), arrival_time + self.time_to_live)
+
+    def _set_data(self, agent_id, data_type, data, arrival_time=None):
+        arrival_time = self.age if arrival_time is None else arrival_time
+
+        if self._is_expired(arrival_time):
+            return  # already outdated
+
+        self.data.setdefault(data_type, dict())[agent_id] = data
+        self.data_age.setdefault(data_type, dict())[agent_id] = arrival_time
+        self.expiry.push((data_type, agent_id), arrival_time + self.time_to_live)
+
+    def set_distance(self, agent_id, distance):
+        self._set_distances(self.agent_id, {agent_id: distance}, {})
+
+    def set_information(self, agent_id, information):
+        """
+        :param agent_id: id of the agent that sent the information
+        :param information: data to store, with their relative age if known
+        """
+        relative_ages = information.get(DataTypes.age.value, {})
+
+        for data_type in information:
+            if data_type in METADATA_TYPES:
+                continue
+
+            if data_type == DataTypes.distance.value:
+                distances_ages = relative_ages.get(data_type, {})
+                self._set_distances(agent_id, information[data_type], {
+                    other_agent_id: self.age - relative_age for other_agent_id, relative_age in distances_ages.items()
+                })
+            else:
+                self._set_data(agent_id, data_type, information[data_type], self.age - relative_ages.get(data_type, 0))
+
+    def _get_own_distances(self):
+        """:return: distances measured by the agent that are not outdated, with their relative age"""
+        self.expire()
+
+        distances = self.data[DataTypes.distance.value][self.agent_id]
+        arrival_times = self.data_age[DataTypes.distance.value][self.agent_id]
+
+        return dict(distances), {
+            other_agent_id: self.age - arrival_time for other_agent_id, arrival_time in arrival_times.items()
+        }
+
+    def _get_own_data(self, data_type):
+        """:return: data of the given type about the agent if not outdated, with its relative age"""
+        self.expire()
+
+        if self.agent_id not in self.data_age.get(data_type, {}):
+            return None, None
+
+        return self.data[data_type][self.agent_id], self.age - self.data_age[data_type][self.agent_id]
+
+
 class FakeDataStorage(DataStorage):
     def __init__(self):
         super().__init__(0, time_to_live=10, clock_frequency=0.01)
@@ -0,0 +1,72 @@
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import numpy as np
+
+from src.modules.storage.model import DataTypes, DistanceRow
+
+
+def freeze(data):
+    """:return: read-only copy of the given data"""
+    if isinstance(data, DistanceRow):
+        return freeze_distances(data)
+    if isinstance(data, Mapping):
+        return MappingProxyType({key: freeze(value) for key, value in data.items()})
+    if isinstance(data, (list, tuple)):
+        return tuple(freeze(value) for value in data)
+    if isinstance(data, np.ndarray):
+        data = data.copy()
+        data.setflags(write=False)
+
+    return data
+
+
+def freeze_distances(distances):
+    """:return: read-only distance row, only copied (without loss of precision) when given as a dictionary"""
+    if not isinstance(distances, DistanceRow):
+        distances = DistanceRow(
+            np.fromiter(distances.keys(), dtype=int, count=len(distances)),
+            np.fromiter(distances.values(), dtype=float, count=len(distances)),
+        )
+
+    for array in (distances.ids, distances.distances, distances.versions):
+        if array is not None:
+            array.setflags(write=False)
+
+    return distances
+
+
+class PayloadSnapshot:
+    """
+    Immutable, versioned snapshot of the information an agent sends, so that readers never see the owner
+    mutating its storage, and share the same view instead of copying it.
+    Publishing replaces the whole snapshot at once. Apart from the distances, which the storages update in place,
+    data is replaced rather than mutated by the storages: the frozen view of data published again is reused.
+    """
+
+    def __init__(self):
+        self.version = 0  # number of snapshots published
+        self.age = 0.0  # age of the storage when the payload was published
+        self.payload = MappingProxyType({})
+
+        self._sources = dict()  # data the current payload was frozen from, by data type
+
+    def publish(self, information, age=None):
+        """:return: the new payload, read-only view of the given information"""
+        payload = dict()
+
+        for data_type, data in information.items():
+            if data_type == DataTypes.distance.value:
+                payload[data_type] = freeze_distances(data)
+            elif data_type in self._sources and self._sources[data_type] is data:
+                payload[data_type] = self.payload[data_type]
+            else:
+                payload[data_type] = freeze(data)
+
+        self._sources = dict(information)
+        if age is not None:
+            self.age = age
+        self.version += 1
+        self.payload = MappingProxyType(payload)
+
+        return self.payload
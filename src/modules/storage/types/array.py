@@ -0,0 +1,133 @@
+import numpy as np
+
+from src.modules.storage.index import AgentIndex
+from src.modules.storage.model import DataStorage, DataTypes, DistanceRow, METADATA_TYPES, as_arrays
+
+
+class ArrayDistanceStorage(DataStorage):
+    """
+    Storage keeping the distances known by the agent in preallocated arrays instead of nested dictionaries.
+    Row i holds the distances measured by agent `row_ids[i]`, the first row being the agent itself.
+    Other types of data (e.g. triangulation) are still stored in dictionaries.
+
+    Each distance is versioned with the Lamport clock of the agent that measured it: the clock of an agent
+    goes past the clock of every message it receives, and each measurement increments it. Incoming distances
+    only replace the stored ones when their version is higher, so relayed gossip never overwrites fresher data.
+    """
+
+    def __init__(self, agent_id, capacity=16, time_to_live=10, clock_frequency=0.01):
+        super().__init__(
+            agent_id=agent_id,
+            time_to_live=time_to_live,
+            clock_frequency=clock_frequency,
+        )
+
+        capacity = max(1, capacity)
+
+        self.distances = np.full((capacity, capacity), np.nan, dtype=np.float32)
+        self.ages = np.full((capacity, capacity), np.nan, dtype=np.float32)  # storage age at arrival of each entry
+        self.versions = np.zeros((capacity, capacity), dtype=np.uint32)  # 0 when unknown
+
+        self.clock = 0  # logical clock, versioning the distances measured by the agent
+
+        # Mapping between the agent ids and the rows (or columns) of the arrays
+        self.index = AgentIndex(grow=self._grow, capacity=capacity)
+        self.index.register([self.agent_id])
+
+    @property
+    def size(self):
+        return self.index.size
+
+    @property
+    def row_ids(self):
+        """Agent id of each row"""
+        return self.index.ids
+
+    def _grow(self, capacity):
+        distances = np.full((capacity, capacity), np.nan, dtype=np.float32)
+        distances[:self.size, :self.size] = self.distances[:self.size, :self.size]
+        self.distances = distances
+
+        ages = np.full((capacity, capacity), np.nan, dtype=np.float32)
+        ages[:self.size, :self.size] = self.ages[:self.size, :self.size]
+        self.ages = ages
+
+        versions = np.zeros((capacity, capacity), dtype=np.uint32)
+        versions[:self.size, :self.size] = self.versions[:self.size, :self.size]
+        self.versions = versions
+
+    def _merge_distances(self, agent_id, distances):
+        """:return: number of distances updated"""
+        ids, values, versions = as_arrays(distances)
+
+        row = self.index.register([agent_id])[0]
+        columns = self.index.register(ids)
+
+        if versions is not None:
+            # Only keep the entries fresher than the stored ones
+            newer = versions > self.versions[row, columns]
+            if not np.any(newer):
+                return 0
+
+            columns, values, versions = columns[newer], values[newer], versions[newer]
+            self.versions[row, columns] = versions
+
+        self.distances[row, columns] = values
+        self.ages[row, columns] = self.age
+
+        return len(columns)
+
+    def get_distances(self, agent_id):
+        """:return: distances known to have been measured by the given agent"""
+        row = self.index.get([agent_id])[0]
+        if row < 0:
+            return DistanceRow([], np.zeros(0, dtype=np.float32))
+
+        distances = self.distances[row, :self.size]
+        known = ~np.isnan(distances)
+
+        return DistanceRow(self.row_ids[:self.size][known], distances[known], self.versions[row, :self.size][known])
+
+    def set_distance(self, agent_id, distance):
+        column = self.index.register([agent_id])[0]
+
+        self.clock += 1
+
+        self.distances[0, column] = distance
+        self.ages[0, column] = self.age
+        self.versions[0, column] = self.clock
+
+    def set_information(self, agent_id, information):
+        """
+        :param agent_id: id of the agent that sent the information
+        :param information: data to store
+        """
+        self.clock = max(self.clock, information.get(DataTypes.clock.value, 0))
+
+        for data_type in information:
+            if data_type in METADATA_TYPES:
+                continue
+
+            if data_type == DataTypes.distance.value:
+                self._merge_distances(agent_id, information[data_type])
+            else:
+                self._set_data(agent_id, data_type, information[data_type])
+
+    def _prepare_data_for_sending(self):
+        return {
+            DataTypes.distance.value: self.get_distances(self.agent_id),
+            DataTypes.clock.value: self.clock,
+        }
+
+    def get_data_to_send(self):
+        return self._prepare_data_for_sending()
+
+
+class ArrayDistanceAndTriangulationStorage(ArrayDistanceStorage):
+
+    def _prepare_data_for_sending(self):
+        return {
+            DataTypes.triangulation.value: self.data[DataTypes.triangulation.value][self.agent_id],
+            DataTypes.distance.value: self.get_distances(self.agent_id),
+            DataTypes.clock.value: self.clock,
+        }
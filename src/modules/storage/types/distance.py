@@ -1,4 +1,4 @@
-from src.modules.storage.model import DataStorage, DataTypes
+from src.modules.storage.model import DataStorage, DataTypes, TTLDataStorage
 
 
 class DistanceOnlyStorage(DataStorage):
@@ -18,11 +18,15 @@ class DistanceOnlyStorage(DataStorage):
         return self._prepare_data_for_sending()
 
 
-class DistanceOnlyTTLStorage(DataStorage):
-    # TODO: verify the good working of this class
+class DistanceOnlyTTLStorage(TTLDataStorage):
     def _prepare_data_for_sending(self):
+        distances, distances_ages = self._get_own_distances()
+
         return {
-            # DataTypes.distance.value: dict(self._get_all_distances_not_outdated()),
+            DataTypes.distance.value: distances,
+            DataTypes.age.value: {
+                DataTypes.distance.value: distances_ages,
+            },
         }
 
     def get_data_to_send(self):
@@ -47,13 +51,23 @@ class DistanceAndTriangulationStorage(DataStorage):
         return self._prepare_data_for_sending()
 
 
-class DistanceAndTriangulationTTLStorage(DataStorage):
-    # TODO: verify the good working of this class
+class DistanceAndTriangulationTTLStorage(TTLDataStorage):
     def _prepare_data_for_sending(self):
-        return {
-            # DataTypes.triangulation.value: dict(self._get_all_triangulation_not_outdated()),
-            # DataTypes.distance.value: dict(self._get_all_distances_not_outdated()),
+        distances, distances_ages = self._get_own_distances()
+        triangulation, triangulation_age = self._get_own_data(DataTypes.triangulation.value)
+
+        data = {
+            DataTypes.distance.value: distances,
+            DataTypes.age.value: {
+                DataTypes.distance.value: distances_ages,
+            },
         }
 
+        if triangulation is not None:
+            data[DataTypes.triangulation.value] = triangulation
+            data[DataTypes.age.value][DataTypes.triangulation.value] = triangulation_age
+
+        return data
+
     def get_data_to_send(self):
         return self._prepare_data_for_sending()
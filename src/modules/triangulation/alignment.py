@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def procrustes(sources: np.ndarray, target: np.ndarray, reflection=True):
+    """
+    Batched orthogonal Procrustes (Kabsch) fit: rigid transformations best aligning each source on the target,
+    all of them computed with a single batched SVD
+    :param sources: points to align, of shape (k, n, 2), or (n, 2) for a single source
+    :param target: points to align on, of shape (n, 2), matching the points of the sources
+    :param reflection: allow mirrored alignments, chosen directly by the SVD when they fit better than rotations
+    :return: rotations (k, 2, 2), translations (k, 2) and sum of the squared residuals (k,),
+             the aligned sources being `sources @ rotations + translations[:, np.newaxis]`
+    """
+    single = sources.ndim == 2
+    if single:
+        sources = sources[np.newaxis]
+
+    source_centers = sources.mean(axis=1)
+    target_center = target.mean(axis=0)
+
+    centered_sources = sources - source_centers[:, np.newaxis]
+    centered_target = target - target_center
+
+    covariances = np.einsum("kni,nj->kij", centered_sources, centered_target)
+    u, _, vt = np.linalg.svd(covariances)
+
+    if not reflection:
+        # Flip the last axis of the mirrored solutions, to keep proper rotations
+        signs = np.sign(np.linalg.det(u @ vt))
+        signs[signs == 0] = 1
+        u[:, :, -1] *= signs[:, np.newaxis]
+
+    rotations = u @ vt
+    translations = target_center - np.einsum("ki,kij->kj", source_centers, rotations)
+
+    aligned = sources @ rotations + translations[:, np.newaxis]
+    residuals = np.sum((aligned - target) ** 2, axis=(1, 2))
+
+    if single:
+        return rotations[0], translations[0], residuals[0]
+
+    return rotations, translations, residuals
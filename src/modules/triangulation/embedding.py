@@ -0,0 +1,255 @@
+import numpy as np
+from scipy.linalg import eigh
+from scipy.sparse.csgraph import shortest_path
+from scipy.spatial.distance import cdist
+
+
+def complete_distances(distances: np.ndarray):
+    """
+    Fill the unknown distances (zeros outside the diagonal) by the shortest paths through the known ones,
+    an upper bound of the real distances, the largest known distance being used between disconnected agents
+    :return: completed distance matrix and mask of the known distances
+    """
+    known = distances > 0
+
+    if np.all(known | np.eye(len(distances), dtype=bool)):
+        return distances, known
+
+    completed = shortest_path(np.where(known, distances, 0), method="D", directed=False)
+
+    unreachable = np.isinf(completed)
+    if np.any(unreachable):
+        completed[unreachable] = distances.max(initial=0.0)
+
+    return completed, known
+
+
+def classical_mds(distances: np.ndarray, dimensions=2):
+    """
+    Classical (Torgerson) multidimensional scaling: double centering of the squared distances,
+    then only the top eigenvectors of the resulting Gram matrix are computed
+    :param distances: symmetric distance matrix, zeros outside the diagonal being unknown distances
+    :return: coordinates of the points, one row per point
+    """
+    n = len(distances)
+    distances, _ = complete_distances(distances)
+
+    # Gram matrix: B = -1/2 J D^2 J, with J the centering matrix
+    squared = distances ** 2
+    gram = -0.5 * (
+        squared - squared.mean(axis=0) - squared.mean(axis=1)[:, np.newaxis] + squared.mean()
+    )
+
+    values, vectors = eigh(gram, subset_by_index=[n - dimensions, n - 1])
+    values, vectors = values[::-1], vectors[:, ::-1]
+
+    return vectors * np.sqrt(np.maximum(values, 0.0))
+
+
+def stress(distances: np.ndarray, positions: np.ndarray, weights: np.ndarray):
+    """:return: weighted raw stress of the positions with respect to the distances"""
+    embedded = np.linalg.norm(positions[:, np.newaxis] - positions[np.newaxis, :], axis=-1)
+    return 0.5 * np.sum(weights * (embedded - distances) ** 2)
+
+
+def stress_majorization(distances: np.ndarray, positions: np.ndarray, weights=None, max_iterations=10,
+                        tolerance=1e-4, active=None):
+    """
+    Weighted stress majorization (SMACOF) from the given positions, each iteration moving every point
+    to the weighted average of the positions its distances to the others suggest (Jacobi update)
+    :param distances: symmetric distance matrix
+    :param positions: initial coordinates of the points, one row per point
+    :param weights: weights of the distances, 0 for the ones to ignore (unknown distances by default)
+    :param max_iterations: maximum number of iterations
+    :param tolerance: relative decrease of the stress under which the iterations stop
+    :param active: indices of the points to move, the other ones being fixed (all the points by default)
+    :return: coordinates of the points and number of iterations executed,
+             a step increasing the stress (possible with weights) being undone before stopping
+    """
+    if weights is None:
+        weights = (distances > 0).astype(float)
+
+    weights = weights * (1 - np.eye(len(distances)))
+    positions = np.array(positions, dtype=float)
+
+    if active is None:
+        active = np.arange(len(distances))
+
+    # Only the distances of the active points are involved
+    distances, weights = distances[active], weights[active]
+
+    total_weights = weights.sum(axis=1)
+    total_weights[total_weights == 0] = 1.0  # isolated points do not move
+    weighted_distances = weights * distances
+
+    # Distances of the embedding, shared by the stress of an iteration and the update of the next one
+    embedded = cdist(positions[active], positions)
+    previous = 0.5 * np.sum(weights * (embedded - distances) ** 2)
+
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+
+        # Point i suggested by point j: x_j + d_ij (x_i - x_j) / ||x_i - x_j||
+        ratios = np.divide(weighted_distances, embedded, out=np.zeros_like(embedded), where=embedded > 0)
+        previous_positions = positions[active]
+        positions[active] = (
+            (weights - ratios) @ positions + ratios.sum(axis=1)[:, np.newaxis] * previous_positions
+        ) / total_weights[:, np.newaxis]
+
+        embedded = cdist(positions[active], positions)
+        current = 0.5 * np.sum(weights * (embedded - distances) ** 2)
+        if current > previous:
+            positions[active] = previous_positions
+            break
+        if previous - current <= tolerance * max(previous, 1e-12):
+            break
+        previous = current
+
+    return positions, iterations
+
+
+def residual(distances: np.ndarray, positions: np.ndarray, rows: np.ndarray):
+    """:return: root mean square error of the known distances of the given points, relative to their mean"""
+    known = distances[rows] > 0
+    if not np.any(known):
+        return 0.0
+
+    embedded = np.linalg.norm(positions[rows, np.newaxis] - positions[np.newaxis, :], axis=-1)
+
+    return np.sqrt(np.mean((embedded[known] - distances[rows][known]) ** 2)) / distances[rows][known].mean()
+
+
+def closest_points(distances: np.ndarray, rows: np.ndarray, count: int):
+    """:return: the given points and the points closest to them (by known distance), without duplicates"""
+    count = min(count, len(distances) - 1)
+    if count <= 0 or len(rows) == 0:
+        return np.unique(rows)
+
+    known = np.where(distances[rows] > 0, distances[rows], np.inf)
+    closest = np.argpartition(known, count - 1, axis=1)[:, :count]
+    closest = closest[np.isfinite(np.take_along_axis(known, closest, axis=1))]
+
+    return np.union1d(rows, closest)
+
+
+def place_point(distances: np.ndarray, positions: np.ndarray, directions=8, iterations=10):
+    """
+    Position of a point minimizing its stress with respect to fixed points, starting around its closest point
+    in several directions to avoid the mirrored local minima
+    :param distances: distances from the point to the fixed ones, zeros being unknown
+    :param positions: coordinates of the fixed points, one row per point
+    :return: coordinates of the point
+    """
+    known = np.flatnonzero(distances > 0)
+    if len(known) == 0:
+        return positions.mean(axis=0)
+
+    distances, positions = distances[known], positions[known]
+    closest = np.argmin(distances)
+
+    angles = 2 * np.pi * np.arange(directions) / directions
+    candidates = positions[closest] + distances[closest] * np.column_stack((np.cos(angles), np.sin(angles)))
+
+    for _ in range(iterations):
+        differences = candidates[:, np.newaxis] - positions[np.newaxis, :]
+        embedded = np.linalg.norm(differences, axis=-1)
+        embedded[embedded == 0] = 1.0
+
+        candidates = (positions + distances[:, np.newaxis] * differences / embedded[..., np.newaxis]).mean(axis=1)
+
+    embedded = np.linalg.norm(candidates[:, np.newaxis] - positions[np.newaxis, :], axis=-1)
+    errors = np.sum((embedded - distances) ** 2, axis=1)
+
+    return candidates[np.argmin(errors)]
+
+
+def extend_positions(distances: np.ndarray, positions: np.ndarray):
+    """
+    Initial positions of the points added since the given positions were computed (the last rows of the matrix),
+    each one placed with respect to the points placed before it (see `place_point`)
+    :param distances: symmetric distance matrix of all the points, zeros being unknown distances
+    :param positions: coordinates of the first points, one row per point
+    :return: coordinates of all the points
+    """
+    n, known = len(distances), len(positions)
+    extended = np.zeros((n, 2), dtype=float)
+    extended[:known] = positions
+
+    for i in range(known, n):
+        extended[i] = place_point(distances[i, :i], extended[:i])
+
+    return extended
+
+
+def trilaterate(distances: np.ndarray, positions: np.ndarray):
+    """
+    Least squares position of a point from its distances to at least three known points, the circle equations
+    being linearized by subtracting the first one
+    """
+    a = 2 * (positions[1:] - positions[0])
+    b = (
+        distances[0] ** 2 - distances[1:] ** 2
+        + np.sum(positions[1:] ** 2, axis=1) - np.sum(positions[0] ** 2)
+    )
+
+    return np.linalg.lstsq(a, b, rcond=None)[0]
+
+
+def landmark_mds(rows: np.ndarray, landmarks: np.ndarray):
+    """
+    Landmark MDS: classical MDS of the landmarks, every other point being placed by distance-based triangulation
+    against them, in O(n k) time and memory. Points missing some of the landmark distances are trilaterated
+    from the ones they know (see `trilaterate` and `place_point`).
+    :param rows: distances from the landmarks (rows) to all the points (columns), zeros being unknown distances
+    :param landmarks: indices of the landmarks among the points
+    :return: coordinates of the points, one row per point
+    """
+    k = len(landmarks)
+
+    # Distances between landmarks, known by either of them
+    landmark_distances = rows[:, landmarks]
+    landmark_distances = np.where(landmark_distances > 0, landmark_distances, landmark_distances.T)
+    np.fill_diagonal(landmark_distances, 0.0)
+
+    # Unknown ones estimated through the point minimizing the detour, one landmark at a time
+    detour_rows = np.where(rows > 0, rows, np.inf)
+    detour_rows[np.arange(k), landmarks] = 0.0
+    for a in range(k):
+        missing = np.flatnonzero(landmark_distances[a] == 0)
+        missing = missing[missing > a]
+        if len(missing) == 0:
+            continue
+
+        detours = np.min(detour_rows[a] + detour_rows[missing], axis=1)
+        detours[np.isinf(detours)] = 0.0
+        landmark_distances[a, missing] = landmark_distances[missing, a] = detours
+
+    landmark_distances, _ = complete_distances(landmark_distances)
+    squared = landmark_distances ** 2
+    mean = squared.mean(axis=0)
+
+    gram = -0.5 * (squared - mean - squared.mean(axis=1)[:, np.newaxis] + squared.mean())
+    values, vectors = eigh(gram, subset_by_index=[k - 2, k - 1])
+    values, vectors = np.maximum(values[::-1], 1e-12), vectors[:, ::-1]
+
+    landmark_positions = vectors * np.sqrt(values)
+
+    # Distances of every point to the landmarks
+    rows = rows.T
+    known = rows > 0
+    known[landmarks, np.arange(k)] = True
+
+    positions = np.zeros((len(rows), 2), dtype=float)
+
+    # x = -1/2 L# (d^2 - mean), L# being the pseudo-inverse of the landmark positions
+    complete = np.all(known, axis=1)
+    positions[complete] = -0.5 * (rows[complete] ** 2 - mean) @ (vectors / np.sqrt(values))
+
+    for i in np.flatnonzero(~complete):
+        if np.count_nonzero(known[i]) >= 3:
+            positions[i] = trilaterate(rows[i, known[i]], landmark_positions[known[i]])
+        else:
+            positions[i] = place_point(np.where(known[i], rows[i], 0), landmark_positions)
+
+    return positions
@@ -2,7 +2,8 @@ from abc import ABC, abstractmethod
 
 import numpy as np
 
-from src.modules.storage.model import DataTypes
+from src.modules.storage.index import AgentIndex
+from src.modules.storage.model import DataTypes, as_arrays
 
 
 class Triangulation(ABC):  # abstract class
@@ -15,12 +16,36 @@ class Triangulation(ABC):  # abstract class
         self.precision = precision
         self.refresh_rate = refresh_rate
 
+        # Change tracking, so that the triangulation is only updated when its inputs changed
+        self.generation = 0  # bumped by each update of the information that changed it
+        self.solved_generation = -1  # generation of the last triangulation update, -1 before the first one
+        self.change = 0.0  # magnitude of the changes since the last triangulation update
+
+    @property
+    def dirty(self):
+        """Whether the information changed since the last triangulation update"""
+        return self.generation != self.solved_generation
+
+    def _changed(self, magnitude=1.0):
+        """To be called by `update_information` when the information used for triangulation changed"""
+        self.generation += 1
+        self.change += magnitude
+
+    def solved(self, generation=None):
+        """
+        To be called once the triangulation has been updated
+        :param generation: generation of the information when the update started (current one by default)
+        """
+        self.solved_generation = self.generation if generation is None else generation
+        self.change = 0.0
+
     @abstractmethod
     def update_information(self, other_agent_id, distance, information):
         """
         Idea: Could want to use something else than distance matrix
             -> Made more general, each implementation of Triangulation should be able to handle
                the information received from the communication and update its triangulation accordingly
+        Implementations should call `_changed` when the information changed.
         """
         raise NotImplementedError("Triangulation does not implement a specific information update method")
 
@@ -33,7 +58,15 @@ class Triangulation(ABC):  # abstract class
         raise NotImplementedError("Triangulation does not implement a specific triangulation algorithm")
 
 
-class DistanceMatrixTriangulation(Triangulation, ABC):
+class DistanceTriangulation(Triangulation, ABC):
+    """
+    Triangulation based on the distances gathered by the agent, the known agents being indexed in order of
+    appearance (see `AgentIndex`), the arrays of the distances growing with the index.
+    When the information received is versioned (see `ArrayDistanceStorage`), each distance keeps its version
+    and is only overwritten by fresher ones. The distance measured by the agent is versioned with its own
+    Lamport clock, following the same rule as the storage.
+    """
+
     def __init__(self, agent_id, precision=1.0, refresh_rate=0.05):
         super().__init__(
             agent_id=agent_id,
@@ -41,20 +74,54 @@ class DistanceMatrixTriangulation(Triangulation, ABC):
             refresh_rate=refresh_rate
         )
 
-        self.dim = 1
-        self.distance_matrix = np.zeros((self.dim, self.dim), dtype=float)
+        self.clock = 0  # logical clock, versioning the distances measured by the agent
+
+        self.agents = AgentIndex(grow=self._grow)
+
+    @property
+    def dim(self):
+        """Number of agents known"""
+        return self.agents.size
+
+    @property
+    def capacity(self):
+        return self.agents.capacity
+
+    @property
+    def id_to_index(self):
+        """Index of each agent id, -1 when unknown"""
+        return self.agents.index_of
+
+    @property
+    def index_to_id(self):
+        return self.agents.ids[:self.dim].tolist()
 
-        self.id_to_index = dict({
-            self.agent_id: 0
-        })
+    def _register(self, ids):
+        """:return: indices of the given agents, registering the ones not known yet"""
+        return self.agents.register(ids)
 
-    def _grow(self):
-        self.dim += 1
-        new_matrix = np.zeros((self.dim, self.dim), dtype=float)
-        new_matrix[0:self.dim - 1, 0:self.dim - 1] = self.distance_matrix
-        self.distance_matrix = new_matrix
+    @abstractmethod
+    def _grow(self, capacity):
+        """Grow the arrays of the distances to the given number of agents, keeping the `dim` first ones"""
+        raise NotImplementedError("DistanceTriangulation does not implement a specific storage of the distances")
+
+    @abstractmethod
+    def _merge_distances(self, row, columns, values, versions, distance, version):
+        """
+        Merge the distance measured to an agent and the distances it measured
+        :param row: index of the agent
+        :param columns: indices of the agents it measured the distances to
+        :param values: distances it measured
+        :param versions: versions of these distances, None when not versioned
+        :param distance: distance measured to it by the agent
+        :param version: version of that distance, 0 when not versioned
+        :return: change of the distances
+        """
+        raise NotImplementedError("DistanceTriangulation does not implement a specific merge of the distances")
 
     def update_information(self, other_agent_id, distance, information):
+        sender_clock = information.get(DataTypes.clock.value)
+
         if DataTypes.distance.value in information:
             information = information[DataTypes.distance.value]
         else:
@@ -63,22 +130,110 @@ class DistanceMatrixTriangulation(Triangulation, ABC):
         if other_agent_id == self.agent_id:
             return
 
-        if other_agent_id not in self.id_to_index:
-            self.id_to_index[other_agent_id] = self.dim
-            self._grow()
+        # Agents met through the other agent are registered as well, not to lose their distances
+        ids, values, versions = as_arrays(information, dtype=float)
+        indices = self._register(np.concatenate(([other_agent_id], ids)))
+
+        # Version of the measured distance, after the clock of the sender
+        version = 0
+        if sender_clock is not None:
+            self.clock = max(self.clock, sender_clock) + 1
+            version = self.clock
+
+        change = self._merge_distances(indices[0], indices[1:], values, versions, distance, version)
+
+        if change > 0:
+            self._changed(change)
+
+
+class DistanceMatrixTriangulation(DistanceTriangulation, ABC):
+    """Triangulation based on the distance matrix gathered by the agent, each cell being versioned"""
+
+    def __init__(self, agent_id, precision=1.0, refresh_rate=0.05):
+        super().__init__(
+            agent_id=agent_id,
+            precision=precision,
+            refresh_rate=refresh_rate
+        )
+
+        # Distance matrix of the known agents, a view over a buffer which capacity doubles when full
+        self._distances = np.zeros((self.capacity, self.capacity), dtype=float)
+        self._versions = np.zeros((self.capacity, self.capacity), dtype=np.uint32)  # 0 when not versioned
+
+        self.changed_rows = set()  # indices of the agents which distances changed since the last triangulation
+
+        self._register([self.agent_id])
+
+    @property
+    def distance_matrix(self):
+        return self._distances[:self.dim, :self.dim]
+
+    @property
+    def version_matrix(self):
+        return self._versions[:self.dim, :self.dim]
+
+    def _grow(self, capacity):
+        distances = np.zeros((capacity, capacity), dtype=float)
+        distances[:self.dim, :self.dim] = self.distance_matrix
+        self._distances = distances
+
+        versions = np.zeros((capacity, capacity), dtype=np.uint32)
+        versions[:self.dim, :self.dim] = self.version_matrix
+        self._versions = versions
+
+    def _merge_mask(self, row, columns, values, versions):
+        """
+        :return: mask of the distances received to keep, the fresher ones when versioned (all of them otherwise),
+                 to be overridden to also filter them by certainty
+        """
+        if versions is None:
+            return None
+
+        return versions > self._versions[row, columns]
+
+    def _set_distance(self, i, j, distance, version):
+        """:return: change of the distance"""
+        change = abs(self._distances[i, j] - distance)
+        if change > 0:
+            self.changed_rows.add(i)  # row received, j only being affected through it
+
+        self._distances[i, j] = distance
+        self._distances[j, i] = distance
+        self._versions[i, j] = version
+        self._versions[j, i] = version
+
+        return change
+
+    def _take_changed_rows(self):
+        """
+        :return: indices of the agents which distances changed since the last call, the next changes being
+                 collected in a new set, as they can be received while the triangulation is computed
+        """
+        rows, self.changed_rows = self.changed_rows, set()
+        return np.fromiter(rows, dtype=int, count=len(rows))
 
+    def _merge_distances(self, row, columns, values, versions, distance, version):
         # Update distance matrix for triangulation
-        self.distance_matrix[self.id_to_index[self.agent_id], self.id_to_index[other_agent_id]] = distance
-        self.distance_matrix[self.id_to_index[other_agent_id], self.id_to_index[self.agent_id]] = distance
-
-        # Update distance matrix with other agent information
-        for agent in information:
-            if agent in self.id_to_index:
-                self.distance_matrix[self.id_to_index[other_agent_id], self.id_to_index[agent]] = information[agent]
-                self.distance_matrix[self.id_to_index[agent], self.id_to_index[other_agent_id]] = information[agent]
-            else:
-                # agent doesn't know the given robot, does not listen
-                pass
+        change = self._set_distance(self.id_to_index[self.agent_id], row, distance, version)
+
+        # Update distance matrix with other agent information, at once
+        mask = self._merge_mask(row, columns, values, versions)
+        if mask is not None:
+            columns, values = columns[mask], values[mask]
+            versions = versions[mask] if versions is not None else None
+
+        if len(columns) > 0:
+            changes = np.abs(self._distances[row, columns] - values)
+            if np.any(changes > 0):
+                self.changed_rows.add(row)  # row received, the columns only being affected through it
+                change += changes.sum()
+
+            self._distances[row, columns] = values
+            self._distances[columns, row] = values
+            self._versions[row, columns] = 0 if versions is None else versions
+            self._versions[columns, row] = 0 if versions is None else versions
+
+        return change
 
 
 class FakeTriangulation(Triangulation):
@@ -0,0 +1,47 @@
+from src.modules.triangulation.model import Triangulation
+
+
+class TriangulationScheduler:
+    """
+    Decide whether the triangulation of an agent is worth updating, from the changes of its information:
+        - skip: nothing changed since the last update;
+        - rate-limit: at most one update every `min_interval` calls;
+        - coalesce: changes smaller than `min_change` accumulate, until they are worth an update,
+                    or until `max_staleness` calls went by without update.
+    By default, the triangulation is only skipped when nothing changed.
+    """
+
+    def __init__(self, min_interval=1, min_change=0.0, max_staleness=10):
+        """
+        :param min_interval: minimum number of calls between two updates
+        :param min_change: magnitude of the changes (e.g. sum of the distances changes) worth an update
+        :param max_staleness: maximum number of calls small changes can wait
+        """
+        self.min_interval = min_interval
+        self.min_change = min_change
+        self.max_staleness = max_staleness
+
+        self.calls = 0  # calls since the last update
+
+        # Statistics
+        self.updates = 0
+        self.skipped = 0
+
+    def should_update(self, triangulation: Triangulation):
+        self.calls += 1
+
+        due = triangulation.dirty and self.calls >= self.min_interval and (
+            triangulation.change >= self.min_change or self.calls >= self.max_staleness
+        )
+
+        if not due:
+            self.skipped += 1
+
+        return due
+
+    def updated(self, triangulation: Triangulation, generation=None):
+        """:param generation: generation of the information when the update started"""
+        triangulation.solved(generation)
+
+        self.calls = 0
+        self.updates += 1
@@ -1,8 +1,7 @@
-import math
-
 import numpy as np
 from welltestpy.tools import triangulate, sym
 
+from src.modules.triangulation.alignment import procrustes
 from src.modules.triangulation.model import DistanceMatrixTriangulation
 
 
@@ -17,18 +16,34 @@ class DelaunayTriangulation(DistanceMatrixTriangulation):
     def _prune_distance_matrix(self):
         """Property: Only need three agents information to triangulate a fourth one position"""
 
-        matrix = np.zeros((self.dim, self.dim), dtype=float)
+        upper = np.triu(np.ones((self.dim, self.dim), dtype=bool), k=1)
+        known = upper & (self.distance_matrix > 0)
+
+        # Only the first three known distances of each row are kept, the other ones are marked as unknown (-1)
+        kept = known & (np.cumsum(known, axis=1) <= 3)
+
+        return np.where(kept, self.distance_matrix, np.where(upper, -1.0, 0.0))
+
+    def _closest_candidate(self, const):
+        """
+        :return: candidate closest to the previous triangulation once aligned on it (rotation, reflection and
+                 translation), all the candidates being aligned at once, in the frame of the previous triangulation
+        """
+        candidates = [np.asarray(candidate, dtype=float).reshape(-1, 2) for candidate in const]
+
+        # Points shared by the candidates and the previous triangulation
+        shared = min(len(self.previous_const), *(len(candidate) for candidate in candidates))
+        if shared == 0:
+            return const[0]
+
+        rotations, translations, residuals = procrustes(
+            np.stack([candidate[:shared] for candidate in candidates]),
+            np.asarray(self.previous_const[:shared], dtype=float),
+        )
 
-        for i in range(self.dim):
-            count = 0
-            for j in range(i + 1, self.dim):
-                if self.distance_matrix[i, j] > 0 and not count >= 3:
-                    matrix[i, j] = self.distance_matrix[i, j]
-                    count += 1
-                else:
-                    matrix[i, j] = -1
+        best = int(np.argmin(residuals))
 
-        return matrix
+        return (candidates[best] @ rotations[best] + translations[best]).tolist()
 
     def update_triangulation(self):
         if self.dim < 2:
@@ -47,25 +62,10 @@ class DelaunayTriangulation(DistanceMatrixTriangulation):
                 self.tri_y = [0]
             return None, None, None
 
-        points = []
-
         if not self.previous_const:
             points = const[0]
         else:
-            current_best = math.inf
-            for possibility in const:
-                error = 0
-                for i in range(
-                        len(possibility) if len(possibility) <= len(self.previous_const) else len(self.previous_const)):
-                    error += math.sqrt(
-                        (possibility[i][0] - self.previous_const[i][0]) ** 2
-                        +
-                        (possibility[i][1] - self.previous_const[i][1]) ** 2
-                    )
-
-                if current_best > error:
-                    current_best = error
-                    points = possibility
+            points = self._closest_candidate(const)
 
         self.previous_const = points
 
@@ -91,15 +91,6 @@ class DelaunaySubTriangulation(DelaunayTriangulation):
         super().__init__(agent_id, precision=precision, refresh_rate=refresh_rate)
 
         self.previous_const = []
-        self.index_to_id = [agent_id]
-
-    def update_information(self, other_agent_id, distance, information):
-        previous = self.dim
-
-        super().update_information(other_agent_id, distance, information)
-
-        if previous < self.dim:
-            self.index_to_id.append(other_agent_id)
 
     def update_triangulation(self):
         x, y, _ = super().update_triangulation()
@@ -109,10 +100,14 @@ class DelaunaySubTriangulation(DelaunayTriangulation):
 
         num = len(x) if len(x) == len(y) else 0
 
+        # The alignment on the previous triangulation moves the agent, bring it back at the origin
+        x = [value - x[0] for value in x]
+        y = [value - y[0] for value in y]
+        self.tri_x, self.tri_y = x, y
+
+        index_to_id = self.index_to_id
         res = {
-            self.index_to_id[i]: [x[i], y[i]] for i in range(num)
+            index_to_id[i]: [x[i], y[i]] for i in range(num)
         }
 
-        res[self.agent_id] = [0, 0]
-
         return x, y, res
@@ -0,0 +1,142 @@
+import numpy as np
+
+from src.modules.triangulation.embedding import landmark_mds
+from src.modules.triangulation.model import DistanceTriangulation
+
+
+class LandmarkMDScaleTriangulation(DistanceTriangulation):
+    """
+    Triangulation of large swarms: classical MDS of a few well-spread landmarks,
+    the other agents being placed by triangulation against the landmarks.
+    Only the distances from the landmarks to the agents are kept, in O(n k) memory instead of the n x n matrix
+    of `DistanceMatrixTriangulation`, versioned the same way.
+
+    The agent itself is the first landmark, the next senders become landmarks until there are enough of them.
+    Then, a sender replaces the landmark the closest to the others when it is farther than that from all of them
+    (online max-min selection), the distances received from the replaced landmark being forgotten.
+    """
+
+    def __init__(self, agent_id, precision=10.0, refresh_rate=0.05, landmarks=20):
+        """:param landmarks: maximum number of landmarks"""
+        super().__init__(agent_id, precision=precision, refresh_rate=refresh_rate)
+
+        self.landmarks = landmarks
+
+        # Distances from the landmarks (rows) to the known agents (columns), which capacity doubles when full
+        self._rows = np.zeros((self.landmarks, self.capacity), dtype=float)
+        self._versions = np.zeros((self.landmarks, self.capacity), dtype=np.uint32)  # 0 when not versioned
+
+        # Landmarks, by row
+        self.size = 0
+        self.landmark_indices = np.full(self.landmarks, -1, dtype=int)
+        self._row_of = np.full(self.capacity, -1, dtype=int)  # row of each agent, -1 when not a landmark
+
+        self._register([self.agent_id])
+        self._add_landmark(0, 0)
+
+    @property
+    def landmark_rows(self):
+        return self._rows[:self.size, :self.dim]
+
+    def _grow(self, capacity):
+        rows = np.zeros((self.landmarks, capacity), dtype=float)
+        rows[:, :self.dim] = self._rows[:, :self.dim]
+        self._rows = rows
+
+        versions = np.zeros((self.landmarks, capacity), dtype=np.uint32)
+        versions[:, :self.dim] = self._versions[:, :self.dim]
+        self._versions = versions
+
+        row_of = np.full(capacity, -1, dtype=int)
+        row_of[:self.dim] = self._row_of[:self.dim]
+        self._row_of = row_of
+
+    def _add_landmark(self, row, index):
+        """Make the agent the landmark of the given row, forgetting the distances of the previous one"""
+        if self.landmark_indices[row] >= 0:
+            self._row_of[self.landmark_indices[row]] = -1
+
+        self.landmark_indices[row] = index
+        self._row_of[index] = row
+        self._rows[row] = 0.0
+        self._versions[row] = 0
+        self.size = max(self.size, row + 1)
+
+    def _landmark_row(self, sender, columns, values):
+        """:return: row of the landmark the sender is (or becomes), -1 when it is not worth a landmark"""
+        if self._row_of[sender] >= 0:
+            return self._row_of[sender]
+
+        if self.size < self.landmarks:
+            self._add_landmark(self.size, sender)
+            return self.size - 1
+
+        # Distances from the sender to the landmarks, from its message or from the landmarks rows
+        landmarks = self.landmark_indices
+        distances = self._rows[:, sender].copy()
+        rows = self._row_of[columns]
+        distances[rows[rows >= 0]] = values[rows >= 0]
+
+        known = distances > 0
+        if not np.any(known):
+            return -1
+
+        # Distance from each landmark to the closest other one, the agent itself always staying a landmark
+        separations = self._rows[:, landmarks]
+        separations = np.where(separations > 0, separations, separations.T)
+        separations[separations == 0] = np.inf
+        closest = separations.min(axis=1)
+        closest[0] = np.inf
+
+        weakest = int(np.argmin(closest))
+        if distances[known].min() <= closest[weakest]:
+            return -1
+
+        self._add_landmark(weakest, sender)
+        return weakest
+
+    def _merge(self, rows, columns, values, versions):
+        """:return: change of the distances, only the fresher ones being kept when versioned"""
+        if versions is not None:
+            newer = versions > self._versions[rows, columns]
+            rows, columns, values, versions = rows[newer], columns[newer], values[newer], versions[newer]
+
+        change = np.abs(self._rows[rows, columns] - values).sum()
+
+        self._rows[rows, columns] = values
+        self._versions[rows, columns] = 0 if versions is None else versions
+
+        return change
+
+    def _merge_distances(self, sender, columns, values, versions, distance, version):
+        # Distance measured by the agent
+        change = abs(self._rows[0, sender] - distance)
+        self._rows[0, sender] = distance
+        self._versions[0, sender] = version
+
+        # Whole row of the sender, when it is a landmark
+        row = self._landmark_row(sender, columns, values)
+        if row >= 0:
+            change += self._merge(np.full(len(columns), row), columns, values, versions)
+
+        # Distances from the sender to the landmarks
+        rows = self._row_of[columns]
+        towards = (rows >= 0) & (rows != row)
+        if np.any(towards):
+            change += self._merge(
+                rows[towards], np.full(np.count_nonzero(towards), sender), values[towards],
+                versions[towards] if versions is not None else None,
+            )
+
+        return change
+
+    def update_triangulation(self):
+        if self.dim < 3 or self.size < 3:
+            return None, None, None
+
+        coordinates = landmark_mds(self.landmark_rows, self.landmark_indices[:self.size])
+
+        self.tri_x = coordinates[:, 0].tolist()
+        self.tri_y = coordinates[:, 1].tolist()
+
+        return self.tri_x, self.tri_y, None
@@ -1,20 +1,110 @@
 import math
+
+import numpy as np
 from scipy.spatial import distance_matrix
 from sklearn.manifold import MDS
 
+from src.modules.triangulation.embedding import (
+    classical_mds, closest_points, extend_positions, residual, stress_majorization
+)
 from src.modules.triangulation.model import DistanceMatrixTriangulation
 
 
 class MDScaleTriangulation(DistanceMatrixTriangulation):
     """Triangulation of the swarm using a distance matrix and the Delaunay triangulation algorithm"""
 
-    def __init__(self, agent_id, precision=10.0, refresh_rate=0.05):
+    def __init__(self, agent_id, precision=10.0, refresh_rate=0.05, classical=True, polish_iterations=0,
+                 warm_start=False, max_iterations=5, tolerance=1e-3,
+                 incremental=False, neighbours=8, local_iterations=30, max_changed=0.25, drift_tolerance=0.01):
+        """
+        :param classical: use classical MDS on the measured distances instead of sklearn iterative MDS
+        :param polish_iterations: stress majorization iterations refining the classical MDS result
+        :param warm_start: refine the previous triangulation by stress majorization instead of starting over,
+                           slower than the classical MDS of complete distances, whose result it only approaches
+        :param max_iterations: stress majorization iterations allowed to refine the previous triangulation
+        :param tolerance: relative decrease of the stress under which the refinement stops
+        :param incremental: only refine the agents which distances changed, and their closest neighbours
+                            (implies the warm start)
+        :param neighbours: number of closest neighbours refined with each changed agent
+        :param local_iterations: stress majorization iterations allowed to refine the changed agents
+        :param max_changed: fraction of changed agents above which the whole triangulation is refined
+        :param drift_tolerance: relative error of the refined agents above which the whole triangulation is refined
+        """
         super().__init__(agent_id, precision=precision, refresh_rate=refresh_rate)
 
+        self.classical = classical
+        self.polish_iterations = polish_iterations
+
+        self.warm_start = warm_start
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+        self.iterations = 0  # stress majorization iterations of the last update
+
+        self.incremental = incremental
+        self.neighbours = neighbours
+        self.local_iterations = local_iterations
+        self.max_changed = max_changed
+        self.drift_tolerance = drift_tolerance
+        self.full_updates = 0  # updates of the whole triangulation, when incremental
+
+    def _warm_triangulation(self, changed_rows: np.ndarray):
+        # Agents registered since the last update are placed around the agents they know
+        previous = len(self.tri_x)
+        coordinates = extend_positions(self.distance_matrix, np.column_stack((self.tri_x, self.tri_y)))
+
+        active = None
+        if self.incremental:
+            changed = np.union1d(changed_rows, np.arange(previous, self.dim))
+
+            if len(changed) == 0:
+                self.iterations = 0
+                return self.tri_x, self.tri_y
+
+            if len(changed) <= self.max_changed * self.dim:
+                active = closest_points(self.distance_matrix, changed, self.neighbours)
+
+        coordinates, self.iterations = stress_majorization(
+            self.distance_matrix, coordinates, tolerance=self.tolerance, active=active,
+            max_iterations=self.max_iterations if active is None else self.local_iterations,
+        )
+
+        # Fall back to the whole triangulation when the local refinement does not fit the distances anymore
+        if active is not None and residual(self.distance_matrix, coordinates, active) > self.drift_tolerance:
+            active = None
+            coordinates, iterations = stress_majorization(
+                self.distance_matrix, coordinates, max_iterations=self.max_iterations, tolerance=self.tolerance
+            )
+            self.iterations += iterations
+
+        if active is None:
+            self.full_updates += 1
+
+        return coordinates[:, 0].tolist(), coordinates[:, 1].tolist()
+
+    def _classical_triangulation(self):
+        coordinates = classical_mds(self.distance_matrix)
+
+        if self.polish_iterations > 0:
+            coordinates, self.iterations = stress_majorization(
+                self.distance_matrix, coordinates, max_iterations=self.polish_iterations
+            )
+
+        return coordinates[:, 0].tolist(), coordinates[:, 1].tolist()
+
     def update_triangulation(self):
         if self.dim < 3:
             return None, None, None
 
+        if self.classical:
+            changed_rows = self._take_changed_rows()
+
+            if (self.warm_start or self.incremental) and len(self.tri_x) >= 3:
+                self.tri_x, self.tri_y = self._warm_triangulation(changed_rows)
+            else:
+                self.tri_x, self.tri_y = self._classical_triangulation()
+
+            return self.tri_x, self.tri_y, None
+
         try:
             # Convert the matrix to a distance matrix
             d = distance_matrix(self.distance_matrix, self.distance_matrix)
@@ -1,11 +1,10 @@
 import copy
-import math
 from queue import PriorityQueue
 
 import numpy as np
-from skimage import transform
 
 from src.modules.storage.model import DataTypes
+from src.modules.triangulation.alignment import procrustes
 from src.modules.triangulation.model import Triangulation
 from src.modules.triangulation.types.delaunay import DelaunaySubTriangulation
 
@@ -41,12 +40,19 @@ class ReconstructTriangulation(Triangulation):
         if self.agent_id == 0:
             print("New Information:", information)
 
-        if DataTypes.triangulation.value in information:
-            self.triangulation_data[other_agent_id] = information[DataTypes.triangulation.value]
+        triangulation = information.get(DataTypes.triangulation.value)
+        if triangulation is not None and triangulation != self.triangulation_data.get(other_agent_id):
+            self.triangulation_data[other_agent_id] = triangulation
+            self._changed(len(triangulation))
 
-        x, y, other_points = self.sub_triangulation.update_triangulation()
+        # Sub triangulation only updated when its distances changed, the map of the agent when it moved
+        if self.sub_triangulation.dirty:
+            x, y, other_points = self.sub_triangulation.update_triangulation()
+            self.sub_triangulation.solved()
 
-        self.triangulation_data[self.agent_id] = other_points
+            if other_points != self.triangulation_data[self.agent_id]:
+                self.triangulation_data[self.agent_id] = other_points
+                self._changed(len(other_points))
 
         if self.agent_id == 0:
             print("Total Information:", self.triangulation_data)
@@ -92,45 +98,18 @@ class ReconstructTriangulation(Triangulation):
                 continue
 
             # Convert common points to numpy arrays
-            source_points = np.array([robot_source_knowledge[point] for point in common_points])
-            source_points_sym = source_points * np.array([1, -1])  # same point but with a symmetry over X axis
-
-            target_points = np.array([robot_target_knowledge[point] for point in common_points])
-
-            # Estimate the transformation matrix
-            matrix = transform.estimate_transform('euclidean', source_points, target_points)
-            matrix_sym = transform.estimate_transform('euclidean', source_points_sym, target_points)
-
-            # Apply the transformation
-            transformed_robot_knowledge = {}
-            transformed_robot_knowledge_sym = {}
-
-            error = 0
-            error_sym = 0
-
-            for point, coord in robot_source_knowledge.items():
-                transformed_robot_knowledge[point] = list(transform.matrix_transform(
-                    np.array(coord), matrix
-                )[0])
-
-                transformed_robot_knowledge_sym[point] = list(transform.matrix_transform(
-                    np.array(coord), matrix_sym
-                )[0])
-
-                # error with the target point
-                if point in common_points:
-                    error += math.sqrt(
-                        (transformed_robot_knowledge[point][0] - robot_target_knowledge[point][0]) ** 2 +
-                        (transformed_robot_knowledge[point][1] - robot_target_knowledge[point][1]) ** 2
-                    )
-                    error_sym += math.sqrt(
-                        (transformed_robot_knowledge_sym[point][0] - robot_target_knowledge[point][0]) ** 2 +
-                        (transformed_robot_knowledge_sym[point][1] - robot_target_knowledge[point][1]) ** 2
-                    )
-
-            # Verify the one that better fits
-            if error_sym < error:
-                transformed_robot_knowledge = transformed_robot_knowledge_sym
+            common_points = list(common_points)
+            source_points = np.array([robot_source_knowledge[point] for point in common_points], dtype=float)
+            target_points = np.array([robot_target_knowledge[point] for point in common_points], dtype=float)
+
+            # Estimate the transformation, the SVD choosing between rotation and symmetry directly
+            rotation, translation, _ = procrustes(source_points, target_points)
+
+            # Apply the transformation to all the points of the source at once
+            points = np.array(list(robot_source_knowledge.values()), dtype=float).reshape(-1, 2)
+            transformed_robot_knowledge = dict(zip(
+                robot_source_knowledge.keys(), (points @ rotation + translation).tolist()
+            ))
 
             for point in robot_target_knowledge:
                 transformed_robot_knowledge[point] = robot_target_knowledge[point]
@@ -0,0 +1,183 @@
+import numpy as np
+
+from src.modules.triangulation.model import DistanceMatrixTriangulation
+
+
+class TrilaterationTriangulation(DistanceMatrixTriangulation):
+    """
+    Triangulation of the swarm by incremental trilateration:
+        1. three anchors are placed in closed form: the agent itself at the origin, a second agent on the x-axis,
+           a third one, forming the widest triangle with them, by intersection of two circles (above the x-axis);
+        2. at each round, every agent knowing its distance to at least three placed agents is placed
+           by least squares, all at once, then refined by a few Gauss-Newton iterations.
+    With noisy distances, almost aligned placed agents fit both a position and its mirror: agents whose
+    mirror position fits their distances nearly as well, or whose system is ill-conditioned, wait for a further
+    round, with more placed agents to choose between them. Agents that cannot be placed are left out.
+    """
+
+    def __init__(self, agent_id, precision=10.0, refresh_rate=0.05, refinement_iterations=3, max_condition=1e6,
+                 mirror_ratio=5.0):
+        """
+        :param refinement_iterations: Gauss-Newton iterations refining the least squares positions
+        :param max_condition: condition number of the least squares system above which an agent is not placed
+        :param mirror_ratio: an agent is not placed while its mirror position (see `_trilaterate`) is not that
+                             many times worse at fitting its distances
+        """
+        super().__init__(agent_id, precision=precision, refresh_rate=refresh_rate)
+
+        self.refinement_iterations = refinement_iterations
+        self.max_condition = max_condition
+        self.mirror_ratio = mirror_ratio
+
+    def _place_anchors(self, distances, known):
+        """:return: indices and positions of three anchors, None if there are none"""
+        first = self.id_to_index[self.agent_id]
+
+        # Second anchor: the agent sharing the most known agents with the first one, then the farthest
+        candidates = np.flatnonzero(known[first])
+        if len(candidates) == 0:
+            return None
+
+        shared = np.sum(known[candidates] & known[first], axis=1)
+        second = candidates[np.lexsort((distances[first, candidates], shared))[-1]]
+
+        # Third anchor: the agent forming the widest triangle with the first two
+        candidates = np.flatnonzero(known[first] & known[second])
+        if len(candidates) == 0:
+            return None
+
+        a, b, c = distances[first, second], distances[first, candidates], distances[second, candidates]
+        s = (a + b + c) / 2
+        areas = s * (s - a) * (s - b) * (s - c)  # squared, Heron's formula
+
+        best = np.argmax(areas)
+        if areas[best] <= (1e-3 * a * a) ** 2:
+            return None  # aligned agents
+
+        third = candidates[best]
+
+        x = (b[best] ** 2 - c[best] ** 2 + a ** 2) / (2 * a)
+        y = np.sqrt(max(b[best] ** 2 - x ** 2, 0.0))
+
+        return np.array([first, second, third]), np.array([[0.0, 0.0], [a, 0.0], [x, y]])
+
+    def _refine(self, positions, distances, weights, anchors):
+        """
+        Gauss-Newton refinement of the distances errors
+        :return: refined positions and root mean square error of their distances
+        """
+        for _ in range(self.refinement_iterations):
+            differences = positions[:, np.newaxis] - anchors[np.newaxis]
+            norms = np.linalg.norm(differences, axis=-1)
+            norms[norms == 0] = 1e-12
+
+            jacobian = differences / norms[..., np.newaxis]
+            residuals = norms - distances
+
+            jtj = np.einsum("pk,pki,pkj->pij", weights, jacobian, jacobian) + 1e-9 * np.eye(2)
+            jtr = np.einsum("pk,pki,pk->pi", weights, jacobian, residuals)
+
+            positions = positions - np.linalg.solve(jtj, jtr[..., np.newaxis])[..., 0]
+
+        residuals = np.linalg.norm(positions[:, np.newaxis] - anchors[np.newaxis], axis=-1) - distances
+        return positions, np.sqrt(np.sum(weights * residuals ** 2, axis=1) / weights.sum(axis=1))
+
+    def _trilaterate(self, distances, weights, anchors):
+        """
+        Least squares positions of several agents at once, from their distances to the anchors
+        :param distances: distances from the agents (rows) to the anchors (columns)
+        :param weights: 1 where the distance is known, 0 otherwise
+        :param anchors: positions of the anchors
+        :return: positions of the agents, and whether they could be placed
+        """
+        # Anchors of each agent relative to their center and scaled by their spread,
+        # the conditioning of the system only depending on their geometry
+        counts = weights.sum(axis=1)
+        centers = weights @ anchors / counts[:, np.newaxis]
+        relative = anchors[np.newaxis] - centers[:, np.newaxis]
+        scales = np.sqrt(np.einsum("pk,pki,pki->p", weights, relative, relative) / counts)
+        scales[scales == 0] = 1.0
+        relative /= scales[:, np.newaxis, np.newaxis]
+
+        # Linear in (x, y, r = x^2 + y^2): -2 a.x + r = d^2 - |a|^2
+        a = np.concatenate((-2 * relative, np.ones(relative.shape[:2] + (1,))), axis=-1)
+        b = (distances / scales[:, np.newaxis]) ** 2 - np.sum(relative ** 2, axis=-1)
+
+        normal = np.einsum("pk,pki,pkj->pij", weights, a, a)
+        rhs = np.einsum("pk,pki,pk->pi", weights, a, b)
+
+        # Almost aligned anchors give an ill-conditioned system: the agent cannot be placed without mirror ambiguity
+        placed = np.linalg.cond(normal) < self.max_condition
+
+        positions = np.zeros((len(distances), 2))
+        if not np.any(placed):
+            return positions, placed
+
+        solutions = np.linalg.solve(normal[placed], rhs[placed][..., np.newaxis])[:, :2, 0]
+        positions[placed] = centers[placed] + scales[placed, np.newaxis] * solutions
+
+        positions[placed], errors = self._refine(positions[placed], distances[placed], weights[placed], anchors)
+
+        # Mirror of each position across the main axis of its anchors, refined the same way: when it fits the
+        # distances about as well, the other distances cannot tell them apart
+        covariances = np.einsum("pk,pki,pkj->pij", weights[placed], relative[placed], relative[placed])
+        axes = np.linalg.eigh(covariances)[1][..., -1]
+        offsets = positions[placed] - centers[placed]
+        mirrors = centers[placed] + 2 * np.sum(offsets * axes, axis=1)[:, np.newaxis] * axes - offsets
+
+        mirrors, mirror_errors = self._refine(mirrors, distances[placed], weights[placed], anchors)
+
+        ambiguous = (
+            (mirror_errors <= self.mirror_ratio * errors + 1e-9 * scales[placed])
+            & (np.linalg.norm(mirrors - positions[placed], axis=1) > 0.1 * scales[placed])
+        )
+        placed[np.flatnonzero(placed)[ambiguous]] = False
+
+        return positions, placed
+
+    def update_triangulation(self):
+        if self.dim < 3:
+            return None, None, None
+
+        self._take_changed_rows()  # not used, every agent being placed again
+
+        distances = self.distance_matrix
+        known = distances > 0
+
+        anchors = self._place_anchors(distances, known)
+        if anchors is None:
+            return None, None, None
+
+        positions = np.full((self.dim, 2), np.nan)
+        positions[anchors[0]] = anchors[1]
+        is_placed = np.zeros(self.dim, dtype=bool)
+        is_placed[anchors[0]] = True
+
+        while True:
+            placed = np.flatnonzero(is_placed)
+            unplaced = np.flatnonzero(~is_placed)
+
+            weights = known[np.ix_(unplaced, placed)].astype(float)
+            ready = weights.sum(axis=1) >= 3
+            if not np.any(ready):
+                break
+
+            rows = unplaced[ready]
+            new_positions, new_placed = self._trilaterate(
+                distances[np.ix_(rows, placed)], weights[ready], positions[placed]
+            )
+            if not np.any(new_placed):
+                break
+
+            positions[rows[new_placed]] = new_positions[new_placed]
+            is_placed[rows[new_placed]] = True
+
+        placed = np.flatnonzero(is_placed)
+
+        self.tri_x = positions[placed, 0].tolist()
+        self.tri_y = positions[placed, 1].tolist()
+
+        index_to_id = self.index_to_id
+        return self.tri_x, self.tri_y, {
+            index_to_id[i]: [x, y] for i, x, y in zip(placed.tolist(), self.tri_x, self.tri_y)
+        }
@@ -3,10 +3,14 @@ import math
 import random
 import time
 
+import numpy as np
+
 from src.modules.communication.model import Communication, FakeCommunication
 from src.modules.movement.simple import walk_forward
 from src.modules.storage.model import DataStorage, FakeDataStorage, DataTypes
 from src.modules.triangulation.model import Triangulation, FakeTriangulation
+from src.modules.triangulation.scheduler import TriangulationScheduler
+from src.simulation.swarm import SwarmState
 
 
 class Agent:
@@ -17,7 +21,12 @@ class Agent:
             communication: Communication = FakeCommunication(),
             data_storage: DataStorage = FakeDataStorage(),
             agent_movement=walk_forward,
+            triangulation_scheduler: TriangulationScheduler = None,
     ):
+        # Define the agent's physical state, a row of a swarm state (its own until gathered in a swarm)
+        self.state = SwarmState()
+        self.row = 0
+
         # Define the agent's properties
         self.id = agent_id
         self.radius = 1
@@ -42,6 +51,9 @@ class Agent:
         # Define the agent's communication and triangulation
         self.communication = communication
         self.triangulation = triangulation
+        self.triangulation_scheduler = (
+            triangulation_scheduler if triangulation_scheduler is not None else TriangulationScheduler()
+        )
 
         # Define the agent's memory
         self.tri_y = []
@@ -52,6 +64,70 @@ class Agent:
     def __str__(self):
         return f"agent_{self.id}"
 
+    @property
+    def x(self):
+        return self.state.positions[self.row, 0]
+
+    @x.setter
+    def x(self, value):
+        self.state.positions[self.row, 0] = value
+
+    @property
+    def y(self):
+        return self.state.positions[self.row, 1]
+
+    @y.setter
+    def y(self, value):
+        self.state.positions[self.row, 1] = value
+
+    @property
+    def dx(self):
+        return self.state.headings[self.row, 0]
+
+    @dx.setter
+    def dx(self, value):
+        self.state.headings[self.row, 0] = value
+
+    @property
+    def dy(self):
+        return self.state.headings[self.row, 1]
+
+    @dy.setter
+    def dy(self, value):
+        self.state.headings[self.row, 1] = value
+
+    @property
+    def angle(self):
+        return self.state.angles[self.row]
+
+    @angle.setter
+    def angle(self, value):
+        self.state.angles[self.row] = value
+
+    @property
+    def speed(self):
+        return self.state.speeds[self.row]
+
+    @speed.setter
+    def speed(self, value):
+        self.state.speeds[self.row] = value
+
+    @property
+    def radius(self):
+        return self.state.radii[self.row]
+
+    @radius.setter
+    def radius(self, value):
+        self.state.radii[self.row] = value
+
+    @property
+    def paused(self):
+        return self.state.paused[self.row]
+
+    @paused.setter
+    def paused(self, value):
+        self.state.paused[self.row] = value
+
     def move(self):
         raise NotImplementedError("Agent does not implement a default movement")
 
@@ -71,6 +147,57 @@ class Agent:
                 else:
                     self.dy *= 1
 
+    def triangulation_step(self):
+        """Update the triangulation if its information changed enough, return whether it was updated"""
+        if not self.triangulation_scheduler.should_update(self.triangulation):
+            return False
+
+        generation = self.triangulation.generation
+        x, y, triangulation = self.triangulation.update_triangulation()
+        self.triangulation_scheduler.updated(self.triangulation, generation)
+
+        if triangulation is not None and isinstance(triangulation, dict):
+            self.data.set_information(
+                self.id,
+                information={
+                    DataTypes.triangulation.value: triangulation
+                },
+            )
+
+        if x is not None and y is not None:
+            self.tri_x = x
+            self.tri_y = y
+
+        return True
+
+    def communication_step(self, agents, context):
+        """Try a single exchange with another agent, return whether information was received"""
+        # Receive information from another agent
+        agent_id, distance, information = self.communication.receive_information(agents, context)
+
+        if agent_id == -1:
+            # Drop the information, did not communicate
+            return False
+
+        self.receive(agent_id, distance, information)
+
+        return True
+
+    def receive(self, agent_id, distance, information):
+        """Handle the information received from another agent, at the given distance"""
+        # Information first, so that the measured distance is versioned after the clock of the sender
+        self.data.set_information(agent_id, information)
+        self.data.set_distance(agent_id, distance)
+
+        # Update triangulation with the new information
+        self.triangulation.update_information(agent_id, distance, information)
+
+        # Execute clock tick in data storage so that it can measure relative time
+        self.data.clock_tick()
+
+        # Publish a snapshot of the information to send, once the storage is up-to-date
+        self.communication.publish(self.data.get_data_to_send(), self.data.age)
+
     def triangulation_handler(self):
         while self.triangulate:
             if self.paused:
@@ -78,19 +205,7 @@ class Agent:
                 time.sleep(self.triangulation.refresh_rate)
                 continue
 
-            x, y, triangulation = self.triangulation.update_triangulation()
-
-            if triangulation is not None and isinstance(triangulation, dict):
-                self.data.set_information(
-                    self.id,
-                    information={
-                        DataTypes.triangulation.value: triangulation
-                    },
-                )
-
-            if x is not None and y is not None:
-                self.tri_x = x
-                self.tri_y = y
+            self.triangulation_step()
 
             time.sleep(self.triangulation.refresh_rate)
 
@@ -101,26 +216,58 @@ class Agent:
                 time.sleep(self.communication.refresh_rate)
                 continue
 
-            # Receive information from another agent
-            agent_id, distance, information = self.communication.receive_information(agents, context)
-
-            if agent_id == -1:
-                # Drop the information, did not communicate
+            if not self.communication_step(agents, context):
                 continue
 
-            self.data.set_distance(agent_id, distance)
-            self.data.set_information(agent_id, information)
-
-            self.communication.data = self.data.get_data_to_send()
-
-            # Update triangulation with the new information
-            self.triangulation.update_information(agent_id, distance, information)
-
-            # Execute clock tick in data storage so that it can measure relative time
-            self.data.clock_tick()
-
             time.sleep(self.communication.refresh_rate)
 
     def stop(self):
         self.triangulate = False
         self.communicate = False
+
+
+def _overlap(center, radius, other_center, other_radius):
+    """Same bounding box test as in `Agent.collide`, on one axis"""
+    lower = other_center - other_radius
+    upper = other_center + other_radius
+
+    return (
+        ((lower < center + radius) & (center + radius < upper))
+        | ((lower < center - radius) & (center - radius < upper))
+    )
+
+
+def collide_agents(state: SwarmState, first: np.ndarray, second: np.ndarray):
+    """
+    Batched version of `Agent.collide` for candidate pairs of rows of a swarm state.
+    Each agent of a pair reacts to the other, as it would when checking all the agents one after the other.
+    """
+    positions = state.positions
+    radii = state.radii
+
+    # Both directions of each pair, the first agent of a pair reacting to the second one
+    agent = np.concatenate([first, second])
+    other = np.concatenate([second, first])
+
+    hit = np.ones(len(agent), dtype=bool)
+    for axis in range(2):
+        hit &= _overlap(positions[agent, axis], radii[agent], positions[other, axis], radii[other])
+
+    hit &= ~state.paused[agent]
+    agent, other = agent[hit], other[hit]
+
+    if len(agent) == 0:
+        return
+
+    # dx is given by the last colliding agent, in the order of the agents
+    order = np.lexsort((other, agent))
+    agent, other = agent[order], other[order]
+    last = np.append(agent[1:] != agent[:-1], True)
+
+    state.headings[agent[last], 0] = np.where(
+        positions[agent[last], 0] < positions[other[last], 0], -1, 1
+    )
+
+    # dy is reversed for each colliding agent that is above
+    flips = np.bincount(agent[positions[agent, 1] < positions[other, 1]], minlength=len(state))
+    state.headings[flips % 2 == 1, 1] *= -1
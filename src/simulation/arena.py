@@ -2,8 +2,10 @@ import random
 from dataclasses import dataclass
 
 import math
+import numpy as np
 
 from src.simulation.agent import Agent
+from src.simulation.swarm import SwarmState
 
 
 @dataclass()
@@ -17,6 +19,9 @@ class Arena:
         # TODO: implement collision detection for agents in the different arenas
         raise NotImplementedError("Arena does not implement a collision detection")
 
+    def collide_batch(self, state: SwarmState, rows: np.ndarray):
+        raise NotImplementedError("Arena does not implement a batched collision detection")
+
     def place_agent_randomly(self):
         raise NotImplementedError("Arena does not implement a random agent placement")
 
@@ -47,6 +52,19 @@ class RectangleArena(Arena):
         elif agent.y + agent.radius > self.height:
             agent.dy = -1
 
+    def collide_batch(self, state: SwarmState, rows: np.ndarray):
+        positions = state.positions[rows]
+        headings = state.headings[rows]
+        radii = state.radii[rows, np.newaxis]
+        limits = np.array([self.width, self.height])
+
+        headings = np.where(
+            positions - radii < 0, 1,
+            np.where(positions + radii > limits, -1, headings)
+        )
+
+        state.headings[rows] = headings
+
     def area(self):
         return self.width * self.height
 
@@ -71,3 +89,6 @@ class CircleArena(Arena):
 
     def collide(self, agent: Agent):
         raise NotImplementedError("CircleArena collision behavior not implemented")
+
+    def collide_batch(self, state: SwarmState, rows: np.ndarray):
+        raise NotImplementedError("CircleArena collision behavior not implemented")
@@ -0,0 +1,26 @@
+import time
+
+
+class Clock:
+    """Time source of the step engine, measuring the simulated time (in seconds)"""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def sleep(self, seconds):
+        raise NotImplementedError("Clock does not implement a default sleep")
+
+
+class RealTimeClock(Clock):
+    """Clock following the wall clock, pacing the simulation for a live display"""
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+        self.time += seconds
+
+
+class VirtualClock(Clock):
+    """Clock only advancing the simulated time, letting the simulation run as fast as the CPU allows"""
+
+    def sleep(self, seconds):
+        self.time += seconds
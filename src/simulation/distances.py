@@ -0,0 +1,37 @@
+import numpy as np
+from scipy.spatial.distance import cdist
+
+
+class GroundTruthDistances:
+    """
+    Ground truth distances between the agents of a swarm, computed from the positions of the swarm state.
+    In incremental mode, only the rows of the agents that moved more than the tolerance since their last
+    computation are updated, pairs of agents that both stayed in place can thus be off by twice the tolerance.
+    """
+
+    def __init__(self, matrix: np.ndarray, incremental=False, tolerance=0.0):
+        self.matrix = matrix  # updated in place, as it is shared with the communication modules
+        self.incremental = incremental
+        self.tolerance = tolerance
+
+        self.reference = None  # positions used for the last computation of each row
+
+    def update(self, positions: np.ndarray):
+        """:return: rows of the matrix that have been recomputed"""
+        if not self.incremental or self.reference is None:
+            cdist(positions, positions, out=self.matrix)
+            self.reference = positions.copy()
+
+            return np.arange(len(positions))
+
+        displacement = np.sum((positions - self.reference) ** 2, axis=1)
+        moved = np.flatnonzero(displacement > self.tolerance ** 2)
+
+        if len(moved) > 0:
+            rows = cdist(positions[moved], positions)
+
+            self.matrix[moved, :] = rows
+            self.matrix[:, moved] = rows.T
+            self.reference[moved] = positions[moved]
+
+        return moved
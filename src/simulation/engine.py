@@ -0,0 +1,138 @@
+import math
+
+import numpy as np
+
+from src.modules.communication.scheduler import CommunicationScheduler
+from src.modules.movement.simple import BATCHED_MOVEMENTS
+from src.simulation.agent import collide_agents
+from src.simulation.clock import VirtualClock
+from src.simulation.spatial import SpatialHash
+
+
+class StepEngine:
+    """
+    Single-threaded lock-step engine advancing all the agents of a simulation, one phase at a time:
+        1. movement of every agent;
+        2. collisions with the arena and between agents;
+        3. update of the ground truth distances;
+        4. communication of the agents that are due to communicate;
+        5. triangulation of the agents that are due to triangulate, and which information changed.
+
+    Agents are always processed in the same order, so that a run only depends on the random generators state.
+    """
+
+    def __init__(self, simulation, clock=None):
+        self.simulation = simulation
+        self.clock = clock if clock is not None else VirtualClock()
+
+        self.tick = 0  # number of steps executed
+        self.refresh_rate = simulation.refresh_rate  # duration of a step (in seconds)
+
+        # Statistics of the run
+        self.events = 0
+        self.messages = 0
+        self.triangulations = 0
+
+        # Exchanges of the whole swarm scheduled at once, instead of each agent pulling information
+        self.scheduler = None
+        if simulation.batched_communication:
+            self.scheduler = CommunicationScheduler(
+                simulation.agents, symmetric=simulation.symmetric_communication
+            )
+
+        # Rows of the swarm state grouped by movement, so that known movements are applied in batch
+        movements = dict()
+        for row, agent in enumerate(simulation.agents):
+            movements.setdefault(agent.move, []).append(row)
+
+        self.movement_groups = [
+            (movement, np.array(rows, dtype=int)) for movement, rows in movements.items()
+        ]
+
+        # Broad-phase of the collisions, agents can only collide within two radii
+        self.spatial_hash = SpatialHash(
+            cell_size=2 * float(simulation.state.radii.max(initial=1.0))
+        )
+
+        # Modules refresh rates converted to a number of ticks
+        self.communication_intervals = np.array([
+            self._interval(agent.communication.refresh_rate) for agent in simulation.agents
+        ], dtype=int)
+        self.triangulation_intervals = [
+            self._interval(agent.triangulation.refresh_rate) for agent in simulation.agents
+        ]
+
+    def _interval(self, refresh_rate):
+        return max(1, int(math.floor(refresh_rate / self.refresh_rate + 0.5)))
+
+    def move_agents(self, agents):
+        state = self.simulation.state
+
+        for movement, rows in self.movement_groups:
+            rows = rows[~state.paused[rows]]
+
+            if movement in BATCHED_MOVEMENTS:
+                BATCHED_MOVEMENTS[movement](state, rows)
+            else:
+                for row in rows:
+                    agents[row].move(agents[row])
+
+    def collide_agents(self, agents):
+        state = self.simulation.state
+        rows = state.active_rows()
+
+        self.simulation.arena.collide_batch(state, rows)
+
+        self.spatial_hash.rebuild(state.positions)
+        collide_agents(state, *self.spatial_hash.candidate_pairs())
+
+    def exchange_information(self, agents):
+        context = self.simulation.distance_matrix
+
+        if self.scheduler is not None:
+            rows = self.simulation.state.active_rows()
+            rows = rows[self.tick % self.communication_intervals[rows] == 0]
+            rows = rows[[agents[row].communicate for row in rows]]
+
+            events = self.scheduler.events
+            self.messages += self.scheduler.step(rows, context)
+            self.events += self.scheduler.events - events
+            return
+
+        for agent, interval in zip(agents, self.communication_intervals):
+            if agent.paused or not agent.communicate or self.tick % interval != 0:
+                continue
+
+            if agent.communication_step(agents, context):
+                self.events += 1
+                self.messages += 1
+
+    def update_triangulations(self, agents):
+        for agent, interval in zip(agents, self.triangulation_intervals):
+            if agent.paused or not agent.triangulate or self.tick % interval != 0:
+                continue
+
+            if agent.triangulation_step():
+                self.triangulations += 1
+
+    def step(self):
+        agents = self.simulation.agents
+
+        self.move_agents(agents)
+        self.collide_agents(agents)
+
+        self.simulation.update_distances()
+        self.simulation.update_indices(self.tick)
+
+        self.exchange_information(agents)
+        self.update_triangulations(agents)
+
+        self.tick += 1
+        self.clock.sleep(self.refresh_rate)
+
+    def run(self, duration):
+        """Step the simulation for the given simulated duration (in seconds)"""
+        ticks = int(math.floor(duration / self.refresh_rate + 0.5))
+
+        for _ in range(ticks):
+            self.step()
@@ -0,0 +1,27 @@
+from dataclasses import dataclass, field
+
+
+@dataclass()
+class RunMetrics:
+    experiment: str
+    agents: int
+    ticks: int = 0
+    simulated_time: float = 0.0  # in seconds
+    wall_time: float = 0.0  # in seconds
+    events: int = 0  # exchanges between two agents
+    messages: int = 0  # information received by the agents
+    triangulations: int = 0  # triangulation updates executed by the agents
+    payload: int = 0  # entries (distances, positions, ...) sent by the agents
+    payload_bytes: int = 0  # bytes sent by the agents, when messages are encoded
+
+    # Final state of the swarm, by agent id
+    positions: dict = field(default_factory=dict)
+    triangulation: dict = field(default_factory=dict)
+
+    @property
+    def speedup(self):
+        return self.simulated_time / self.wall_time if self.wall_time > 0 else float("inf")
+
+    @property
+    def messages_per_second(self):
+        return self.messages / self.wall_time if self.wall_time > 0 else float("inf")
@@ -0,0 +1,321 @@
+import random
+import threading
+
+import numpy as np
+from scipy.spatial import cKDTree, Delaunay, QhullError
+from scipy.spatial.distance import pdist, squareform
+
+
+class NeighborIndex:
+    """
+    Index over the positions of the swarm, shared by the communication modules to answer range queries.
+    It is built lazily, at most once per tick, the first time it is queried.
+    """
+
+    def __init__(self):
+        self.tick = None
+        self.positions = np.zeros((0, 2), dtype=float)
+        self.tree = None
+
+    def update(self, tick, positions: np.ndarray):
+        if tick != self.tick:
+            self.tick = tick
+            self.positions = positions
+            self.tree = None
+
+    def _get_tree(self):
+        tree = self.tree
+
+        if tree is None:
+            # Copy the positions, as they keep changing while the tree is used in threaded runs
+            tree = cKDTree(self.positions, copy_data=True)
+            self.tree = tree
+
+        return tree
+
+    def within(self, row, radius):
+        """:return: rows of the agents at most at the given distance of the agent, without the agent itself"""
+        tree = self._get_tree()
+
+        rows = np.array(tree.query_ball_point(tree.data[row], radius, return_sorted=True), dtype=int)
+
+        return rows[rows != row]
+
+
+class DelaunayNeighborCache:
+    """
+    Delaunay graph of the swarm, shared by the communication modules and computed at most once per tick.
+    The neighbours of the agents are stored as CSR adjacency arrays (indptr, indices).
+    When the agents only moved slightly, the previous triangulation is repaired with edge flips instead
+    of being recomputed, as long as no triangle flipped over and the hull stayed convex.
+    Refreshes and queries are serialized by a lock, as agents running in their own threads share the cache.
+    """
+
+    def __init__(self, max_flips=0.1):
+        self.tick = None
+        self.positions = np.zeros((0, 2), dtype=float)
+        self.stale = True
+        self.lock = threading.Lock()
+
+        # Share of the triangles above which the triangulation is recomputed rather than repaired
+        self.max_flips = max_flips
+
+        # CSR adjacency of the Delaunay graph
+        self.indptr = np.zeros(1, dtype=int)
+        self.indices = np.zeros(0, dtype=int)
+
+        # Last triangulation, triangles in counterclockwise order, neighbour i being opposite to vertex i
+        self.simplices = None
+        self.simplices_neighbours = None
+
+    def update(self, tick, positions: np.ndarray):
+        with self.lock:
+            if tick != self.tick:
+                self.tick = tick
+                self.positions = positions
+                self.stale = True
+
+    @staticmethod
+    def _orientations(points, a, b, c):
+        a, b, c = points[a], points[b], points[c]
+
+        return (b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1]) - (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0])
+
+    @staticmethod
+    def _in_circle(points, a, b, c, d):
+        """Positive when d is inside the circle going through the counterclockwise triangle a, b, c"""
+        a, b, c = points[a] - points[d], points[b] - points[d], points[c] - points[d]
+
+        return (
+            np.sum(a ** 2, axis=-1) * (b[..., 0] * c[..., 1] - b[..., 1] * c[..., 0])
+            - np.sum(b ** 2, axis=-1) * (a[..., 0] * c[..., 1] - a[..., 1] * c[..., 0])
+            + np.sum(c ** 2, axis=-1) * (a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0])
+        )
+
+    def _opposite(self, triangle, vertex):
+        """:return: neighbouring triangle across the edge opposite to the vertex, and the index of its own opposite"""
+        other = self.simplices_neighbours[triangle, vertex]
+        index = np.argmax(self.simplices_neighbours[other] == np.asarray(triangle)[..., np.newaxis], axis=-1)
+
+        return other, index
+
+    def _is_valid(self, points):
+        """Whether the last triangulation is still a triangulation of the convex hull of the points"""
+        if self.simplices is None or len(points) != len(self.indptr) - 1:
+            return False
+
+        simplices = self.simplices
+
+        # No triangle flipped over or became degenerate
+        if np.any(self._orientations(points, simplices[:, 0], simplices[:, 1], simplices[:, 2]) <= 0):
+            return False
+
+        # The hull is still convex, its edges being followed counterclockwise
+        triangle, vertex = np.nonzero(self.simplices_neighbours == -1)
+        start = simplices[triangle, (vertex + 1) % 3]
+        end = simplices[triangle, (vertex + 2) % 3]
+
+        successor = np.full(len(points), -1, dtype=int)
+        successor[start] = end
+
+        return not np.any(self._orientations(points, start, end, successor[end]) <= 0)
+
+    def _illegal_edges(self, points):
+        # Each inner edge is shared by two triangles, only check it from the first one
+        triangle, vertex = np.nonzero(self.simplices_neighbours > np.arange(len(self.simplices))[:, np.newaxis])
+        other, index = self._opposite(triangle, vertex)
+
+        simplices = self.simplices
+        in_circle = self._in_circle(
+            points, simplices[triangle, 0], simplices[triangle, 1], simplices[triangle, 2], simplices[other, index]
+        )
+
+        illegal = in_circle > 1e-9
+        return list(zip(triangle[illegal].tolist(), vertex[illegal].tolist()))
+
+    def _flip(self, triangle, vertex):
+        """Replace the edge opposite to the vertex by the other diagonal of the quadrilateral, in place"""
+        simplices = self.simplices
+        neighbours = self.simplices_neighbours
+
+        other, index = self._opposite(triangle, vertex)
+
+        p = simplices[triangle, vertex]
+        q = simplices[triangle, (vertex + 1) % 3]
+        r = simplices[triangle, (vertex + 2) % 3]
+        d = simplices[other, index]
+
+        neighbour_rp = neighbours[triangle, (vertex + 1) % 3]
+        neighbour_pq = neighbours[triangle, (vertex + 2) % 3]
+        neighbour_qd = neighbours[other, (index + 1) % 3]
+        neighbour_dr = neighbours[other, (index + 2) % 3]
+
+        simplices[triangle] = p, q, d
+        neighbours[triangle] = neighbour_qd, other, neighbour_pq
+        simplices[other] = p, d, r
+        neighbours[other] = neighbour_dr, neighbour_rp, triangle
+
+        # Outer triangles that changed of neighbour
+        if neighbour_qd >= 0:
+            neighbours[neighbour_qd][neighbours[neighbour_qd] == other] = triangle
+        if neighbour_rp >= 0:
+            neighbours[neighbour_rp][neighbours[neighbour_rp] == triangle] = other
+
+        # Edges of the quadrilateral that might have become illegal
+        return [(triangle, 0), (triangle, 2), (other, 0), (other, 1)]
+
+    def _repair(self, points):
+        """
+        Restore the Delaunay property with edge flips (Lawson)
+        :return: number of flips executed, None when too many are needed
+        """
+        budget = int(self.max_flips * len(self.simplices)) + 1
+        flips = 0
+        edges = self._illegal_edges(points)
+
+        while edges:
+            triangle, vertex = edges.pop()
+
+            if self.simplices_neighbours[triangle, vertex] < 0:
+                continue
+
+            other, index = self._opposite(triangle, vertex)
+            a, b, c = self.simplices[triangle]
+            if self._in_circle(points, a, b, c, self.simplices[other, index]) <= 1e-9:
+                continue
+
+            flips += 1
+            if flips > budget:
+                return None
+
+            edges.extend(self._flip(triangle, vertex))
+
+        return flips
+
+    def _build_adjacency(self, size):
+        simplices = self.simplices
+
+        start = simplices.ravel()
+        end = simplices[:, [1, 2, 0]].ravel()
+        edges = np.unique(np.concatenate([start * size + end, end * size + start]))
+
+        self.indices = edges % size
+        self.indptr = np.zeros(size + 1, dtype=int)
+        np.cumsum(np.bincount(edges // size, minlength=size), out=self.indptr[1:])
+
+    def _refresh(self):
+        points = np.array(self.positions, dtype=float)
+
+        if self._is_valid(points):
+            flips = self._repair(points)
+
+            if flips is not None:
+                if flips > 0:
+                    self._build_adjacency(len(points))
+                return
+
+        try:
+            triangulation = Delaunay(points)
+        except (QhullError, ValueError):
+            # Not enough agents, or all of them aligned
+            self.simplices = None
+            self.indptr = np.zeros(len(points) + 1, dtype=int)
+            self.indices = np.zeros(0, dtype=int)
+            return
+
+        self.indptr, self.indices = triangulation.vertex_neighbor_vertices
+
+        if len(triangulation.coplanar) > 0:
+            # Some agents are not part of the triangulation, always recompute it
+            self.simplices = None
+            return
+
+        # Keep the triangles in counterclockwise order
+        simplices = triangulation.simplices.copy()
+        neighbours = triangulation.neighbors.copy()
+        clockwise = self._orientations(points, simplices[:, 0], simplices[:, 1], simplices[:, 2]) < 0
+        simplices[clockwise] = simplices[clockwise][:, [0, 2, 1]]
+        neighbours[clockwise] = neighbours[clockwise][:, [0, 2, 1]]
+
+        self.simplices = simplices
+        self.simplices_neighbours = neighbours
+
+    def neighbours(self, row):
+        """:return: rows of the agents sharing an edge with the agent in the Delaunay triangulation"""
+        with self.lock:
+            if self.stale:
+                self._refresh()
+                self.stale = False
+
+            return self.indices[self.indptr[row]:self.indptr[row + 1]]
+
+
+class DistanceWeightedSampler:
+    """
+    Draws communication partners with a probability inversely proportional to their distance.
+    Cumulative weights of every agent are built at most once per tick, from the condensed distance matrix,
+    then each draw is a binary search in the row of the agent.
+    Refreshes and draws are serialized by a lock, as agents running in their own threads share the sampler.
+    """
+
+    def __init__(self, min_distance=1e-6):
+        self.tick = None
+        self.positions = np.zeros((0, 2), dtype=float)
+        self.stale = True
+        self.lock = threading.Lock()
+
+        self.min_distance = min_distance  # avoid infinite weights for agents on top of each other
+
+        self.cumulative = np.zeros((0, 0), dtype=float)  # normalized cumulative weights, one row per agent
+
+    def update(self, tick, positions: np.ndarray):
+        with self.lock:
+            if tick != self.tick:
+                self.tick = tick
+                self.positions = positions
+                self.stale = True
+
+    def _get_cumulative(self):
+        """:return: cumulative weights of the current tick, refreshed if needed"""
+        with self.lock:
+            if self.stale:
+                self._refresh()
+                self.stale = False
+
+            return self.cumulative
+
+    def _refresh(self):
+        condensed = pdist(np.array(self.positions, dtype=float))
+
+        # Weights of the agent itself stay at 0, on the diagonal
+        weights = squareform(1 / np.maximum(condensed, self.min_distance))
+
+        cumulative = np.cumsum(weights, axis=1)
+        totals = cumulative[:, -1:]
+        self.cumulative = np.divide(cumulative, totals, out=np.zeros_like(cumulative), where=totals > 0)
+
+    def draw(self, row):
+        """:return: row of the partner of the agent, -1 if there is none"""
+        cumulative = self._get_cumulative()[row]
+        if len(cumulative) < 2:
+            return -1
+
+        return int(np.searchsorted(cumulative, random.random(), side="right"))
+
+    def draw_all(self, rows=None):
+        """:return: rows of the partners of the given agents (all by default), drawn at once"""
+        cumulative = self._get_cumulative()
+
+        size = len(cumulative)
+        rows = np.arange(size) if rows is None else np.asarray(rows, dtype=int)
+
+        if size < 2:
+            return np.full(len(rows), -1, dtype=int)
+
+        # Shift each row of cumulative weights by its index, so that all rows are searched at once
+        offsets = np.arange(len(rows))
+        shifted = (cumulative[rows] + offsets[:, np.newaxis]).ravel()
+
+        draws = np.searchsorted(shifted, np.random.random(len(rows)) + offsets, side="right")
+
+        return np.minimum(draws - offsets * size, size - 1)
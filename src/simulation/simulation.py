@@ -1,12 +1,18 @@
+import random
 import threading
 import time
 
-import dearpygui.dearpygui as dpg
 import math
 import numpy as np
 
 from src.simulation.agent import Agent
 from src.simulation.arena import Arena, RectangleArena
+from src.simulation.clock import RealTimeClock, VirtualClock
+from src.simulation.distances import GroundTruthDistances
+from src.simulation.engine import StepEngine
+from src.simulation.metrics import RunMetrics
+from src.simulation.neighbors import NeighborIndex, DelaunayNeighborCache, DistanceWeightedSampler
+from src.simulation.swarm import SwarmState
 
 # TODO: could want to use `pause` methods in agents to pause their threads
 paused: bool = False
@@ -25,10 +31,19 @@ class Simulation:
             triangulation_precision=1.0,  # 1 meter
             triangulation_frequency=0.5,  # 500 milliseconds
             communication_frequency=0.5,  # 500 milliseconds
+            # GROUND TRUTH PARAMETERS
+            incremental_distances=False,  # only recompute the distances of the agents that moved
+            distance_tolerance=0.0,  # movement (in meters) under which distances are not recomputed
+            # COMMUNICATION PARAMETERS
+            batched_communication=False,  # schedule the exchanges of all the agents at once
+            symmetric_communication=True,  # both agents of a scheduled exchange receive information
+            delta_communication=False,  # only send to each peer what changed since its last message
+            wire_codec=None,  # PayloadCodec serializing the messages, to measure their size in bytes
     ):
         self.dim = dim
         self.agents = []
         self.agents_thread = []
+        self.state = None  # arrays of the agents physical state, filled at initialization
 
         self.arena = arena
 
@@ -38,14 +53,34 @@ class Simulation:
         self.triangulation_precision = triangulation_precision
         self.triangulation_frequency = triangulation_frequency
         self.communication_frequency = communication_frequency
+        self.batched_communication = batched_communication
+        self.symmetric_communication = symmetric_communication
+        self.delta_communication = delta_communication
+        self.wire_codec = wire_codec
 
         # Simulation Information
         self.distance_matrix = np.zeros((dim, dim), dtype=float)
         self.connection_matrix = np.zeros((dim, dim), dtype=int)
         self.saved_const = []
 
+        self.ground_truth = GroundTruthDistances(
+            self.distance_matrix,
+            incremental=incremental_distances,
+            tolerance=distance_tolerance,
+        )
+
+        # Indices over the agents positions, shared by the communication modules
+        self.neighbor_index = NeighborIndex()
+        self.delaunay_cache = DelaunayNeighborCache()
+        self.partner_sampler = DistanceWeightedSampler()
+        self.frames = 0  # GUI frames, used as ticks when agents run in their own threads
+
         self.main_window = None
 
+        # Lock-step engine, replacing the threads of the agents when used
+        self.engine = None
+        self.running = False
+
     def toggle_pause(self):
         global paused
         paused = not paused
@@ -110,28 +145,69 @@ class Simulation:
 
             time.sleep(self.refresh_rate)
 
-    def update_matrices(self):
+    def launch_engine_thread(self):
+        self.engine = StepEngine(self, clock=RealTimeClock())
+        self.running = True
+
+        engine_thread = threading.Thread(target=self.engine_controller)
+        engine_thread.start()
+        self.agents_thread.append(engine_thread)
+
+    def engine_controller(self):
+        global paused
+
+        print("Starting Step Engine for " + str(len(self.agents)) + " agents")
+        while self.running:
+            if paused:
+                # Avoid causing the thread to over-consume CPU
+                time.sleep(self.refresh_rate)
+                continue
+
+            self.engine.step()
+
+    def update_distances(self):
+        self.ground_truth.update(self.state.positions)
+
+    def update_indices(self, tick):
+        self.neighbor_index.update(tick, self.state.positions)
+        self.delaunay_cache.update(tick, self.state.positions)
+        self.partner_sampler.update(tick, self.state.positions)
+
+    def render_connections(self):
+        import dearpygui.dearpygui as dpg
+
+        positions = self.state.positions.tolist()
+
         for i in range(self.dim):
-            for j in range(i, self.dim):
-                if i != j:
-                    self.distance_matrix[i, j] = math.sqrt(
-                        (self.agents[i].x - self.agents[j].x) ** 2 + (self.agents[i].y - self.agents[j].y) ** 2
-                    )
-                    dpg.configure_item(
-                        int(self.connection_matrix[i, j]),
-                        p1=(self.agents[i].x, self.agents[i].y),
-                        p2=(self.agents[j].x, self.agents[j].y)
-                    )
-                else:
-                    self.distance_matrix[i, j] = 0
+            for j in range(i + 1, self.dim):
+                dpg.configure_item(
+                    int(self.connection_matrix[i, j]),
+                    p1=positions[i],
+                    p2=positions[j]
+                )
+
+    def update_matrices(self):
+        if self.engine is None:
+            # Agents threads do not maintain the distances themselves
+            self.update_distances()
+            self.update_indices(self.frames)
+
+        self.frames += 1
+
+        self.render_connections()
 
     def render_triangulation(self):
+        import dearpygui.dearpygui as dpg
+
         for agent in self.agents:
             if agent.id != 0:
                 continue
             dpg.configure_item(f"triangulation_{str(agent)}", x=agent.tri_x, y=agent.tri_y)
 
     def launch_gui(self):
+        # Imported here so that headless runs never require a display
+        import dearpygui.dearpygui as dpg
+
         dpg.create_context()
         dpg.create_viewport(title="Simulation", x_pos=0, y_pos=0, width=1100, height=645)
 
@@ -234,8 +310,65 @@ class Simulation:
     def setup(self):
         raise NotImplementedError("Simulation does not implement a specific setup")
 
-    def launch(self):
+    def initialize(self):
         self.setup()
 
-        self.launch_agent_threads()
+        # Agents become views of the rows of the swarm state
+        self.state = SwarmState.from_agents(self.agents)
+        self.update_indices(0)
+
+        for agent in self.agents:
+            agent.communication.neighbor_index = self.neighbor_index
+            agent.communication.delaunay_cache = self.delaunay_cache
+            agent.communication.partner_sampler = self.partner_sampler
+            agent.communication.delta = self.delta_communication
+            agent.communication.codec = self.wire_codec
+
+    def launch(self, threaded=False):
+        """
+        :param threaded: run each agent in its own threads instead of the lock-step engine
+        """
+        self.initialize()
+
+        if threaded:
+            self.launch_agent_threads()
+        else:
+            self.launch_engine_thread()
+
         self.launch_gui()
+
+        self.running = False
+
+    def run(self, duration, seed=None):
+        """
+        Run the experiment without GUI, as fast as possible
+        :param duration: simulated time to run (in seconds)
+        :param seed: seed of the random generators, for reproducible runs
+        :return: metrics collected during the run
+        """
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+
+        self.initialize()
+
+        self.engine = StepEngine(self, clock=VirtualClock())
+
+        start = time.perf_counter()
+        self.engine.run(duration)
+        wall_time = time.perf_counter() - start
+
+        return RunMetrics(
+            experiment=type(self).__name__,
+            agents=len(self.agents),
+            ticks=self.engine.tick,
+            simulated_time=self.engine.clock.time,
+            wall_time=wall_time,
+            events=self.engine.events,
+            messages=self.engine.messages,
+            triangulations=self.engine.triangulations,
+            payload=sum(agent.communication.sent_entries for agent in self.agents),
+            payload_bytes=sum(agent.communication.sent_bytes for agent in self.agents),
+            positions={agent.id: (agent.x, agent.y) for agent in self.agents},
+            triangulation={agent.id: (list(agent.tri_x), list(agent.tri_y)) for agent in self.agents},
+        )
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class SpatialHash:
+    """
+    Uniform grid over the positions of a swarm, used as a broad-phase for collisions:
+    only agents in the same or adjacent cells are returned as candidate pairs.
+    """
+
+    # Half of the neighbouring cells, so that each pair of cells is only visited once
+    OFFSETS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+    def __init__(self, cell_size=2.0):
+        self.cell_size = cell_size
+
+        self.order = np.zeros(0, dtype=int)  # agents sorted by cell
+        self.keys = np.zeros(0, dtype=np.int64)  # occupied cells, sorted
+        self.starts = np.zeros(0, dtype=int)  # first agent of each occupied cell in the order
+        self.counts = np.zeros(0, dtype=int)  # number of agents in each occupied cell
+        self.stride = 1
+
+    def rebuild(self, positions: np.ndarray):
+        if len(positions) == 0:
+            self.order = np.zeros(0, dtype=int)
+            self.keys = np.zeros(0, dtype=np.int64)
+            self.starts = np.zeros(0, dtype=int)
+            self.counts = np.zeros(0, dtype=int)
+            return
+
+        cells = np.floor(positions / self.cell_size).astype(np.int64)
+        cells -= cells.min(axis=0)
+
+        # Leave empty rows between the columns of the grid, so that neighbouring keys never wrap around
+        self.stride = int(cells[:, 1].max()) + 3
+        keys = cells[:, 0] * self.stride + cells[:, 1]
+
+        self.order = np.argsort(keys, kind="stable")
+        self.keys, self.starts, self.counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+
+    def candidate_pairs(self):
+        """:return: two arrays of agent rows, each pair of agents being close enough to be colliding"""
+        if len(self.keys) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+        first, second = [], []
+
+        for offset_x, offset_y in self.OFFSETS:
+            neighbours = self.keys + offset_x * self.stride + offset_y
+
+            index = np.minimum(np.searchsorted(self.keys, neighbours), len(self.keys) - 1)
+            found = self.keys[index] == neighbours
+
+            cell_a = np.flatnonzero(found)
+            cell_b = index[found]
+
+            # Every combination of the agents of both cells
+            counts_b = self.counts[cell_b]
+            sizes = self.counts[cell_a] * counts_b
+            pair = np.repeat(np.arange(len(cell_a)), sizes)
+            local = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+
+            local_a = local // counts_b[pair]
+            local_b = local % counts_b[pair]
+
+            if offset_x == 0 and offset_y == 0:
+                # Same cell, keep each pair once and skip the agent itself
+                keep = local_a < local_b
+                pair, local_a, local_b = pair[keep], local_a[keep], local_b[keep]
+
+            first.append(self.order[self.starts[cell_a][pair] + local_a])
+            second.append(self.order[self.starts[cell_b][pair] + local_b])
+
+        return np.concatenate(first), np.concatenate(second)
@@ -0,0 +1,37 @@
+import numpy as np
+
+
+class SwarmState:
+    """Physical state of a swarm stored as arrays, one row per agent, so that it can be updated in batch"""
+
+    def __init__(self, size=1):
+        self.positions = np.zeros((size, 2), dtype=float)  # x, y
+        self.headings = np.zeros((size, 2), dtype=float)  # dx, dy
+        self.angles = np.zeros(size, dtype=float)
+        self.speeds = np.zeros(size, dtype=float)
+        self.radii = np.ones(size, dtype=float)
+        self.paused = np.zeros(size, dtype=bool)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def active_rows(self):
+        return np.flatnonzero(~self.paused)
+
+    @classmethod
+    def from_agents(cls, agents: list):
+        """Gather the state of the agents into a single swarm state, the agents then become views of its rows"""
+        state = cls(len(agents))
+
+        for row, agent in enumerate(agents):
+            state.positions[row] = agent.state.positions[agent.row]
+            state.headings[row] = agent.state.headings[agent.row]
+            state.angles[row] = agent.state.angles[agent.row]
+            state.speeds[row] = agent.state.speeds[agent.row]
+            state.radii[row] = agent.state.radii[agent.row]
+            state.paused[row] = agent.state.paused[agent.row]
+
+            agent.state = state
+            agent.row = row
+
+        return state
@@ -0,0 +1,108 @@
+import numpy as np
+from scipy.linalg import orthogonal_procrustes
+
+from src.modules.storage.model import DataTypes
+from src.modules.triangulation.alignment import procrustes
+from src.modules.triangulation.types.reconstruct import ReconstructTriangulation
+
+
+def rigid(points, angle, translation, mirrored=False):
+    rotation = np.array([[np.cos(angle), np.sin(angle)], [-np.sin(angle), np.cos(angle)]])
+    if mirrored:
+        rotation = rotation @ np.diag([1.0, -1.0])
+
+    return points @ rotation + translation
+
+
+def test_procrustes_recovers_rigid_transformations():
+    target = np.random.default_rng(0).uniform(-10, 10, (12, 2))
+
+    for mirrored in (False, True):
+        source = rigid(target, 0.7, [3.0, -2.0], mirrored)
+        rotation, translation, residual = procrustes(source, target)
+
+        assert np.allclose(source @ rotation + translation, target)
+        assert residual < 1e-12
+        assert np.isclose(np.linalg.det(rotation), -1.0 if mirrored else 1.0)
+
+
+def test_procrustes_matches_scipy():
+    rng = np.random.default_rng(1)
+    source, target = rng.normal(size=(8, 2)), rng.normal(size=(8, 2))
+
+    rotation, _, _ = procrustes(source, target)
+    expected, _ = orthogonal_procrustes(source - source.mean(axis=0), target - target.mean(axis=0))
+
+    assert np.allclose(rotation, expected)
+
+
+def test_batched_procrustes_matches_single_fits():
+    rng = np.random.default_rng(2)
+    target = rng.uniform(-10, 10, (6, 2))
+    sources = np.stack([
+        rigid(target, angle, rng.normal(size=2)) + rng.normal(0, 0.1, (6, 2)) for angle in (0.1, 1.0, 2.5)
+    ])
+
+    rotations, translations, residuals = procrustes(sources, target)
+
+    for source, rotation, translation, residual in zip(sources, rotations, translations, residuals):
+        single = procrustes(source, target)
+        assert np.allclose(single[0], rotation)
+        assert np.allclose(single[1], translation)
+        assert np.isclose(single[2], residual)
+
+
+def test_rotations_only_without_reflection():
+    target = np.random.default_rng(3).uniform(-10, 10, (10, 2))
+    source = rigid(target, 1.2, [0.0, 0.0], mirrored=True)
+
+    rotation, _, residual = procrustes(source, target, reflection=False)
+
+    assert np.isclose(np.linalg.det(rotation), 1.0)
+    assert residual > 1.0
+
+
+def test_reconstruction_merges_the_sub_maps_in_the_agent_frame():
+    rng = np.random.default_rng(4)
+    positions = rng.uniform(0, 20, (9, 2))
+
+    triangulation = ReconstructTriangulation(1)
+    own = positions[:5] - positions[1]
+    triangulation.triangulation_data[1] = dict(zip(range(5), own.tolist()))
+
+    # Sub-maps of other agents, each in its own frame, sharing a few agents with the map of the agent
+    for source, members, mirrored in ((4, [2, 3, 4, 5, 6], True), (6, [3, 4, 6, 7, 8], False)):
+        points = rigid(positions[members], rng.uniform(0, 2 * np.pi), rng.normal(size=2), mirrored)
+        triangulation.triangulation_data[source] = dict(zip(members, points.tolist()))
+
+    _, _, points = triangulation.update_triangulation()
+
+    assert sorted(points) == list(range(9))
+    for agent_id, point in points.items():
+        assert np.allclose(point, positions[agent_id] - positions[1])
+
+
+def test_reconstruction_only_changes_when_the_information_changes():
+    positions = np.random.default_rng(5).uniform(0, 20, (5, 2))
+    distances = np.linalg.norm(positions[:, np.newaxis] - positions[np.newaxis, :], axis=-1)
+
+    triangulation = ReconstructTriangulation(1)
+
+    def receive(sender, sub_map=None):
+        information = {DataTypes.distance.value: {other: distances[sender, other] for other in range(5)}}
+        if sub_map is not None:
+            information[DataTypes.triangulation.value] = sub_map
+        triangulation.update_information(sender, distances[1, sender], information)
+
+    for sender in (0, 2, 3, 4):
+        receive(sender)
+    assert triangulation.triangulation_data[1]
+
+    generation = triangulation.generation
+    for sender in (0, 2, 3, 4):
+        receive(sender)
+    assert triangulation.generation == generation
+
+    receive(2, {2: [0.0, 0.0], 3: [1.0, 0.0]})
+    receive(2, {2: [0.0, 0.0], 3: [1.0, 0.0]})
+    assert triangulation.generation == generation + 1
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src import experiments
+from src.headless import run_headless
+from src.modules.storage.codec import PayloadCodec
+from src.modules.storage.model import DataTypes, DistanceRow
+
+
+def test_round_trip_of_a_versioned_payload():
+    codec = PayloadCodec()
+    information = {
+        DataTypes.distance.value: DistanceRow([1, 4, 300], [1.23, 45.67, 0.5], [3, 9, 12]),
+        DataTypes.triangulation.value: {0: [0.0, 0.0], 1: [1.21, -0.3], 4: [-44.5, 12.25]},
+        DataTypes.clock.value: 12,
+    }
+
+    message = codec.encode(7, information, age=2.5)
+    sender_id, age, decoded = codec.decode(message)
+
+    assert len(message) == codec.size(information)
+    assert (sender_id, age) == (7, 2.5)
+    assert decoded[DataTypes.clock.value] == 12
+
+    distances = decoded[DataTypes.distance.value]
+    assert distances.ids.tolist() == [1, 4, 300]
+    assert distances.versions.tolist() == [3, 9, 12]
+    assert np.allclose(distances.distances, [1.23, 45.67, 0.5], atol=0.005)
+
+    triangulation = decoded[DataTypes.triangulation.value]
+    assert list(triangulation) == [0, 1, 4]
+    for point, expected in zip(triangulation.values(), information[DataTypes.triangulation.value].values()):
+        assert np.allclose(point, expected, atol=0.005)
+
+
+def test_round_trip_of_a_payload_with_ages():
+    codec = PayloadCodec()
+    information = {
+        DataTypes.distance.value: {2: 3.0, 5: 4.5},
+        DataTypes.triangulation.value: {0: [0.0, 0.0]},
+        DataTypes.age.value: {DataTypes.distance.value: {2: 0.5, 5: 1.25}, DataTypes.triangulation.value: 0.75},
+    }
+
+    message = codec.encode(1, information)
+    _, _, decoded = codec.decode(message)
+
+    assert len(message) == codec.size(information)
+    assert dict(decoded[DataTypes.distance.value]) == {2: 3.0, 5: 4.5}
+    assert decoded[DataTypes.distance.value].versions is None
+    assert decoded[DataTypes.age.value] == information[DataTypes.age.value]
+    assert DataTypes.clock.value not in decoded
+
+
+def test_values_out_of_range_are_clipped():
+    codec = PayloadCodec()
+    message = codec.encode(0, {DataTypes.distance.value: {1: 1000.0}, DataTypes.triangulation.value: {1: [-500, 0]}})
+    _, _, decoded = codec.decode(message)
+
+    assert decoded[DataTypes.distance.value][1] == pytest.approx(655.35)
+    assert decoded[DataTypes.triangulation.value][1][0] == pytest.approx(-327.68)
+
+
+def test_unsupported_data_types_are_rejected():
+    with pytest.raises(ValueError):
+        PayloadCodec().encode(0, {DataTypes.custom.value: 1})
+
+
+def test_simulation_counts_the_bytes_sent():
+    metrics = run_headless(experiments.OneAwayFromOther, duration=1.0, seed=0, wire_codec=PayloadCodec())
+
+    assert metrics.messages > 0
+    assert metrics.payload_bytes > metrics.messages * PayloadCodec.HEADER.size
@@ -0,0 +1,58 @@
+import random
+
+import numpy as np
+
+from src.simulation.agent import Agent, collide_agents
+from src.simulation.spatial import SpatialHash
+from src.simulation.swarm import SwarmState
+
+
+def make_agents(count, size):
+    return [Agent(i, random.uniform(0, size), random.uniform(0, size)) for i in range(count)]
+
+
+def test_candidate_pairs_contain_every_close_pair_once():
+    random.seed(0)
+    positions = np.array([(random.uniform(0, 30), random.uniform(0, 30)) for _ in range(200)])
+
+    spatial_hash = SpatialHash(cell_size=2.0)
+    spatial_hash.rebuild(positions)
+    first, second = spatial_hash.candidate_pairs()
+
+    pairs = {(min(a, b), max(a, b)) for a, b in zip(first.tolist(), second.tolist())}
+    assert len(pairs) == len(first)
+    assert all(a != b for a, b in pairs)
+
+    distances = np.abs(positions[:, np.newaxis] - positions[np.newaxis, :]).max(axis=-1)
+    close = {(a, b) for a, b in zip(*np.nonzero(distances < 2.0)) if a < b}
+    assert close <= pairs
+
+
+def test_candidate_pairs_of_an_empty_swarm():
+    spatial_hash = SpatialHash()
+    spatial_hash.rebuild(np.zeros((0, 2)))
+
+    first, second = spatial_hash.candidate_pairs()
+
+    assert len(first) == 0 and len(second) == 0
+
+
+def test_batched_collisions_match_the_agent_collisions():
+    for seed in range(300):
+        random.seed(seed)
+        agents = make_agents(30, 15)
+        expected = [(agent.x, agent.y, agent.dx, agent.dy) for agent in agents]
+
+        # Reference: every agent checking all the others, one after the other
+        reference = [Agent(i, x, y) for i, (x, y, _, _) in enumerate(expected)]
+        for agent, (_, _, dx, dy) in zip(reference, expected):
+            agent.dx, agent.dy = dx, dy
+        for agent in reference:
+            agent.collide(reference)
+
+        state = SwarmState.from_agents(agents)
+        spatial_hash = SpatialHash(cell_size=2.0)
+        spatial_hash.rebuild(state.positions)
+        collide_agents(state, *spatial_hash.candidate_pairs())
+
+        assert state.headings.tolist() == [[agent.dx, agent.dy] for agent in reference]
@@ -0,0 +1,91 @@
+import numpy as np
+
+from src.modules.communication.types.general import GlobalCommunication
+from src.modules.storage.model import DataTypes
+from src.modules.storage.types.array import ArrayDistanceAndTriangulationStorage
+from src.modules.triangulation.types.mds import MDScaleTriangulation
+from src.simulation.simulation import Simulation, Agent
+
+
+def make_sender(delta=True):
+    storage = ArrayDistanceAndTriangulationStorage(0)
+    storage.set_information(0, {DataTypes.triangulation.value: {0: [0, 0]}})
+
+    communication = GlobalCommunication(0)
+    communication.delta = delta
+
+    return storage, communication
+
+
+def test_delta_only_sends_the_distances_measured_since_the_last_message():
+    storage, communication = make_sender()
+
+    storage.set_distance(1, 1.0)
+    storage.set_distance(2, 2.0)
+    communication.publish(storage.get_data_to_send())
+    first = communication.send_information(5)
+
+    storage.set_distance(2, 2.5)
+    storage.set_distance(3, 3.0)
+    communication.publish(storage.get_data_to_send())
+    second = communication.send_information(5)
+
+    assert dict(first[DataTypes.distance.value]) == {1: 1.0, 2: 2.0}
+    assert dict(second[DataTypes.distance.value]) == {2: 2.5, 3: 3.0}
+    assert DataTypes.triangulation.value in first
+    assert DataTypes.triangulation.value not in second  # unchanged
+
+    # Other peers still get everything they did not receive yet
+    assert dict(communication.send_information(6)[DataTypes.distance.value]) == {1: 1.0, 2: 2.5, 3: 3.0}
+
+
+def test_full_mode_counts_every_entry():
+    storage, communication = make_sender(delta=False)
+
+    storage.set_distance(1, 1.0)
+    communication.publish(storage.get_data_to_send())
+
+    for _ in range(3):
+        information = communication.send_information(5)
+
+    assert dict(information[DataTypes.distance.value]) == {1: 1.0}
+    assert communication.sent_messages == 3
+    assert communication.sent_entries == 3 * 3  # triangulation, distance and clock
+
+
+class ArrayStorageExperiment(Simulation):
+    def setup(self):
+        self.agents = [
+            Agent(
+                i, *self.arena.place_agent_randomly(),
+                agents_speed=self.agents_speed,
+                communication=GlobalCommunication(
+                    agent_id=i,
+                    refresh_rate=self.refresh_rate,
+                    communication_frequency=self.communication_frequency,
+                ),
+                triangulation=MDScaleTriangulation(agent_id=i, precision=self.triangulation_precision),
+                data_storage=ArrayDistanceAndTriangulationStorage(agent_id=i),
+            ) for i in range(self.dim)
+        ]
+
+
+def test_delta_messages_give_the_same_distances_with_less_entries():
+    def run(delta):
+        simulation = ArrayStorageExperiment(
+            dim=12, agents_speed=0.5, communication_frequency=0.05,
+            batched_communication=True, delta_communication=delta,
+        )
+        metrics = simulation.run(2.0, seed=1)
+
+        return metrics, [agent.triangulation for agent in simulation.agents]
+
+    full, full_triangulations = run(False)
+    delta, delta_triangulations = run(True)
+
+    assert delta.messages == full.messages
+    assert delta.payload < full.payload
+
+    for full_triangulation, delta_triangulation in zip(full_triangulations, delta_triangulations):
+        assert full_triangulation.index_to_id == delta_triangulation.index_to_id
+        assert np.array_equal(full_triangulation.distance_matrix, delta_triangulation.distance_matrix)
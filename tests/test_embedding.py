@@ -0,0 +1,86 @@
+import numpy as np
+
+from src.modules.triangulation import embedding
+from src.modules.triangulation.embedding import classical_mds, complete_distances, stress, stress_majorization
+
+
+def pairwise(positions, others=None):
+    others = positions if others is None else others
+    return np.linalg.norm(positions[:, np.newaxis] - others[np.newaxis, :], axis=-1)
+
+
+def make_swarm(count, seed=0):
+    positions = np.random.default_rng(seed).uniform(0, 50, (count, 2))
+    return positions, pairwise(positions)
+
+
+def test_classical_mds_is_exact_on_complete_distances():
+    _, distances = make_swarm(40)
+
+    assert np.allclose(pairwise(classical_mds(distances)), distances, atol=1e-6)
+
+
+def test_missing_distances_are_completed_by_shortest_paths():
+    distances = np.array([
+        [0.0, 1.0, 0.0],
+        [1.0, 0.0, 2.0],
+        [0.0, 2.0, 0.0],
+    ])
+
+    completed, known = complete_distances(distances)
+
+    assert completed[0, 2] == completed[2, 0] == 3.0
+    assert not known[0, 2] and known[0, 1]
+
+
+def test_stress_majorization_converges_from_a_perturbed_embedding():
+    positions, distances = make_swarm(30, seed=1)
+    start = positions + np.random.default_rng(2).normal(0, 2.0, positions.shape)
+
+    result, iterations = stress_majorization(distances, start, max_iterations=200, tolerance=1e-9)
+
+    weights = 1 - np.eye(len(distances))
+    assert stress(distances, result, weights) < 1e-3 * stress(distances, start, weights)
+    assert iterations <= 200
+
+
+def test_stress_majorization_never_ends_worse_than_its_start():
+    for seed in range(200):
+        rng = np.random.default_rng(seed)
+        count = rng.integers(2, 8)
+
+        distances = rng.uniform(0.1, 10, (count, count))
+        distances = (distances + distances.T) / 2
+        np.fill_diagonal(distances, 0)
+        weights = rng.uniform(0, 1, (count, count)) ** 3
+        weights = (weights + weights.T) / 2
+
+        start = rng.normal(0, rng.uniform(0.01, 20), (count, 2))
+        result, _ = stress_majorization(distances, start, weights=weights, max_iterations=5, tolerance=0)
+
+        weights = weights * (1 - np.eye(count))
+        assert stress(distances, result, weights) <= stress(distances, start, weights)
+
+
+def test_fixed_points_do_not_move():
+    positions, distances = make_swarm(10, seed=3)
+    start = positions.copy()
+    start[:3] += 5.0
+
+    result, _ = stress_majorization(distances, start, max_iterations=50, active=np.arange(3))
+
+    assert np.array_equal(result[3:], positions[3:])
+    assert np.allclose(result[:3], positions[:3], atol=1e-2)
+
+
+def test_stress_majorization_measures_the_embedding_once_per_iteration(monkeypatch):
+    positions, distances = make_swarm(30, seed=4)
+    start = positions + np.random.default_rng(5).normal(0, 1.0, positions.shape)
+
+    measures = []
+    monkeypatch.setattr(embedding, "cdist", lambda a, b: measures.append(a) or pairwise(a, b))
+
+    _, iterations = stress_majorization(distances, start, max_iterations=5, tolerance=0)
+
+    assert iterations == 5
+    assert len(measures) == iterations + 1
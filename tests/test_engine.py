@@ -0,0 +1,48 @@
+from src import experiments
+from src.simulation.clock import VirtualClock
+from src.simulation.engine import StepEngine
+
+
+def make_experiment(**parameters):
+    return experiments.TestExperiment(
+        dim=8, agents_speed=0.5, communication_frequency=0.05, triangulation_frequency=0.1, **parameters,
+    )
+
+
+def test_run_steps_the_requested_duration():
+    metrics = make_experiment().run(1.0, seed=0)
+
+    assert metrics.ticks == 100
+    assert abs(metrics.simulated_time - 1.0) < 1e-9
+    assert metrics.messages > 0
+    assert metrics.triangulations > 0
+
+
+def test_runs_are_reproducible():
+    first = make_experiment().run(0.5, seed=3)
+    second = make_experiment().run(0.5, seed=3)
+
+    assert first.positions == second.positions
+    assert first.triangulation == second.triangulation
+    assert first.messages == second.messages
+
+
+def test_engine_intervals_follow_the_refresh_rates():
+    simulation = make_experiment()
+    simulation.initialize()
+    engine = StepEngine(simulation, clock=VirtualClock())
+
+    # Communication modules of this experiment refresh every step, their frequency being handled by themselves
+    assert all(interval == 1 for interval in engine.communication_intervals)
+    assert all(interval == 10 for interval in engine.triangulation_intervals)
+
+
+def test_paused_agents_do_not_move():
+    simulation = make_experiment()
+    simulation.initialize()
+    simulation.agents[0].paused = True
+
+    position = (simulation.agents[0].x, simulation.agents[0].y)
+    StepEngine(simulation, clock=VirtualClock()).run(0.2)
+
+    assert (simulation.agents[0].x, simulation.agents[0].y) == position
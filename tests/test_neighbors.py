@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.spatial import Delaunay
+
+from src.simulation import neighbors
+from src.simulation.neighbors import DelaunayNeighborCache, DistanceWeightedSampler
+
+
+def delaunay_neighbours(positions):
+    indptr, indices = Delaunay(positions).vertex_neighbor_vertices
+    return [set(indices[indptr[row]:indptr[row + 1]].tolist()) for row in range(len(positions))]
+
+
+def cache_neighbours(cache, size):
+    return [set(cache.neighbours(row).tolist()) for row in range(size)]
+
+
+def test_cache_matches_a_fresh_triangulation_while_agents_move():
+    rng = np.random.default_rng(0)
+    positions = rng.uniform(0, 50, (40, 2))
+    headings = rng.normal(size=(40, 2))
+
+    cache = DelaunayNeighborCache()
+    repaired = 0
+
+    for tick in range(300):
+        positions += 0.05 * headings
+        cache.update(tick, positions)
+
+        reused = cache.simplices is not None and cache._is_valid(positions)
+        assert cache_neighbours(cache, len(positions)) == delaunay_neighbours(positions)
+        repaired += reused
+
+    # Most ticks only repair the previous triangulation
+    assert repaired > 150
+
+
+def test_repair_flips_an_illegal_edge(monkeypatch):
+    builds = []
+    monkeypatch.setattr(neighbors, "Delaunay", lambda points: builds.append(points) or Delaunay(points))
+
+    positions = np.array([[0.0, 0.0], [2.0, 0.0], [1.0, 1.2], [1.0, -1.2]])
+
+    cache = DelaunayNeighborCache(max_flips=10)
+    cache.update(0, positions)
+    cache.neighbours(0)
+
+    # Squeeze the quadrilateral, so that its other diagonal becomes the Delaunay edge
+    moved = np.array([[0.0, 0.0], [2.0, 0.0], [1.0, 0.3], [1.0, -0.3]])
+    assert cache._is_valid(moved)
+
+    cache.update(1, moved)
+
+    assert cache_neighbours(cache, 4) == delaunay_neighbours(moved)
+    assert len(builds) == 1  # repaired, not recomputed
+
+
+def test_cache_is_computed_once_per_tick():
+    positions = np.random.default_rng(1).uniform(0, 10, (10, 2))
+
+    cache = DelaunayNeighborCache()
+    cache.update(0, positions)
+    cache.neighbours(0)
+    indices = cache.indices
+
+    cache.update(0, positions + 1.0)
+    cache.neighbours(0)
+    assert cache.indices is indices
+
+    cache.update(1, positions)
+    assert cache.stale
+
+
+def test_aligned_agents_have_no_neighbours():
+    cache = DelaunayNeighborCache()
+    cache.update(0, np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0]]))
+
+    assert len(cache.neighbours(1)) == 0
+
+
+def test_concurrent_queries_see_a_complete_triangulation():
+    rng = np.random.default_rng(2)
+    positions = rng.uniform(0, 50, (200, 2))
+    headings = rng.normal(size=(200, 2))
+
+    cache = DelaunayNeighborCache()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for tick in range(20):
+            positions = positions + 0.05 * headings
+            cache.update(tick, positions)
+
+            results = list(executor.map(lambda row: set(cache.neighbours(row).tolist()), range(len(positions))))
+            assert results == delaunay_neighbours(positions)
+
+
+def test_concurrent_draws_never_pick_the_agent_itself():
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(0, 50, (100, 2))
+
+    sampler = DistanceWeightedSampler()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for tick in range(20):
+            positions = positions + rng.normal(scale=0.1, size=positions.shape)
+            sampler.update(tick, positions)
+
+            partners = np.array(list(executor.map(sampler.draw, range(len(positions)))))
+            assert np.all((partners >= 0) & (partners < len(positions)))
+            assert np.all(partners != np.arange(len(positions)))
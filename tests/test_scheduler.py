@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src import experiments
+from src.headless import run_headless
+from src.modules.communication.scheduler import CommunicationScheduler
+
+
+@pytest.mark.parametrize("experiment", [
+    experiments.OneAwayFromOther,
+    experiments.AllStaticRectanglePlacementExperiment,
+    experiments.AllStaticButOneRandomPlacementDelaunayTriangulationDistanceLimitedCommunicationExperiment,
+    experiments.TestExperiment,
+])
+def test_experiments_accept_the_simulation_options(experiment):
+    metrics = run_headless(
+        experiment, duration=0.2, seed=0, batched_communication=True, symmetric_communication=False,
+    )
+
+    assert metrics.ticks == 20
+
+
+def test_symmetric_exchanges_deliver_both_messages():
+    simulation = experiments.TestExperiment(dim=6, communication_frequency=0.01)
+    simulation.initialize()
+
+    scheduler = CommunicationScheduler(simulation.agents, symmetric=True)
+    initiators, partners = np.array([0, 2]), np.array([1, 3])
+
+    assert scheduler.deliver(initiators, partners, simulation.distance_matrix) == 4
+    assert scheduler.events == 2
+
+    for row, other in ((0, 1), (1, 0), (2, 3), (3, 2)):
+        assert other in simulation.agents[row].data.get_data_to_send()["distances"]
+
+
+def test_partners_are_never_the_initiators():
+    simulation = experiments.TestExperiment(dim=10, communication_frequency=1.0)
+    simulation.initialize()
+
+    scheduler = CommunicationScheduler(simulation.agents)
+    initiators, partners = scheduler.select_pairs(np.arange(10), simulation.distance_matrix)
+
+    assert len(initiators) == len(partners)
+    assert np.all(initiators != partners)
+    assert np.all(partners >= 0)
+
+
+@pytest.mark.parametrize("experiment", [
+    experiments.DelaunayCommunicationExperiment,
+    experiments.AllStaticButOneRandomPlacementDelaunayTriangulationDistanceLimitedCommunicationExperiment,
+])
+def test_batched_exchanges_keep_the_message_rate_of_the_agents(experiment):
+    batched = run_headless(experiment, duration=0.5, seed=0, batched_communication=True, symmetric_communication=False)
+    per_agent = run_headless(experiment, duration=0.5, seed=0)
+
+    assert 0.7 * per_agent.messages <= batched.messages <= 1.3 * per_agent.messages
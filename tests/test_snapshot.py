@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from src.modules.storage.model import DataTypes
+from src.modules.storage.snapshot import PayloadSnapshot, freeze
+from src.modules.storage.types.array import ArrayDistanceAndTriangulationStorage
+from src.modules.storage.types.distance import DistanceAndTriangulationStorage
+
+
+def test_snapshot_is_read_only():
+    snapshot = PayloadSnapshot()
+    payload = snapshot.publish({
+        DataTypes.distance.value: {1: 2.0},
+        DataTypes.triangulation.value: {1: [0.5, 1.5]},
+    })
+
+    with pytest.raises(TypeError):
+        payload[DataTypes.clock.value] = 1
+    with pytest.raises(TypeError):
+        payload[DataTypes.triangulation.value][2] = [0, 0]
+    with pytest.raises(ValueError):
+        payload[DataTypes.distance.value].distances[0] = 3.0
+
+    assert payload[DataTypes.triangulation.value][1] == (0.5, 1.5)
+
+
+def test_snapshot_is_isolated_from_later_storage_updates():
+    storage = DistanceAndTriangulationStorage(0)
+    storage.set_distance(1, 2.0)
+    storage.set_information(0, {DataTypes.triangulation.value: {0: [0, 0]}})
+
+    snapshot = PayloadSnapshot()
+    payload = snapshot.publish(storage.get_data_to_send(), age=storage.age)
+
+    storage.set_distance(1, 3.0)
+    storage.set_distance(2, 4.0)
+
+    assert dict(payload[DataTypes.distance.value]) == {1: 2.0}
+    assert snapshot.version == 1
+
+
+def test_dictionary_distances_keep_their_precision():
+    payload = PayloadSnapshot().publish({DataTypes.distance.value: {1: 1.2345678912345}})
+
+    assert payload[DataTypes.distance.value][1] == 1.2345678912345
+
+
+def test_array_rows_are_shared_and_unchanged_data_reused():
+    storage = ArrayDistanceAndTriangulationStorage(0)
+    storage.set_distance(1, 2.0)
+    storage.set_information(0, {DataTypes.triangulation.value: {0: [0, 0]}})
+
+    information = storage.get_data_to_send()
+    snapshot = PayloadSnapshot()
+    first = snapshot.publish(information)
+
+    assert first[DataTypes.distance.value] is information[DataTypes.distance.value]
+    assert first[DataTypes.distance.value].distances.dtype == np.float32
+
+    storage.set_distance(2, 3.0)
+    second = snapshot.publish(storage.get_data_to_send())
+
+    assert second[DataTypes.triangulation.value] is first[DataTypes.triangulation.value]
+    assert dict(second[DataTypes.distance.value]) == {1: 2.0, 2: 3.0}
+
+
+def test_freeze_copies_arrays():
+    array = np.arange(3.0)
+    frozen = freeze({"a": [array]})
+
+    array[0] = 5.0
+
+    assert frozen["a"][0][0] == 0.0
+    assert not frozen["a"][0].flags.writeable
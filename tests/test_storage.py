@@ -0,0 +1,161 @@
+import numpy as np
+
+from src.modules.storage.index import AgentIndex
+from src.modules.storage.model import DataTypes, DistanceRow, as_arrays, payload_size
+from src.modules.storage.types.array import ArrayDistanceStorage, ArrayDistanceAndTriangulationStorage
+from src.modules.storage.types.distance import (
+    DistanceOnlyStorage, DistanceOnlyTTLStorage, DistanceAndTriangulationTTLStorage,
+)
+
+
+def test_distance_row_is_a_mapping():
+    row = DistanceRow([3, 1, 7], [1.5, 2.0, 4.25])
+
+    assert len(row) == 3
+    assert list(row) == [3, 1, 7]
+    assert list(row.keys()) == [3, 1, 7]
+    assert list(row.values()) == [1.5, 2.0, 4.25]
+    assert dict(row.items()) == {3: 1.5, 1: 2.0, 7: 4.25}
+    assert dict(row) == {3: 1.5, 1: 2.0, 7: 4.25}
+    assert row[7] == 4.25
+    assert row.get(5) is None
+    assert 1 in row and 5 not in row
+    assert row == {3: 1.5, 1: 2.0, 7: 4.25}
+
+
+def test_as_arrays_of_rows_and_dictionaries():
+    ids, distances, versions = as_arrays(DistanceRow([1, 2], [3.0, 4.0], [5, 6]))
+    assert ids.tolist() == [1, 2] and distances.tolist() == [3.0, 4.0] and versions.tolist() == [5, 6]
+
+    ids, distances, versions = as_arrays({1: 3.0, 2: 4.0})
+    assert ids.tolist() == [1, 2] and distances.tolist() == [3.0, 4.0] and versions is None
+
+
+def test_payload_size_counts_the_entries():
+    assert payload_size(None) == 0
+    assert payload_size({"distances": DistanceRow([1, 2], [1.0, 2.0]), "clock": 4}) == 3
+
+
+def test_array_storage_sends_the_same_distances_as_the_dictionary_storage():
+    array_storage = ArrayDistanceStorage(0, capacity=2)
+    dict_storage = DistanceOnlyStorage(0)
+
+    for storage in (array_storage, dict_storage):
+        for agent_id, distance in ((4, 1.5), (2, 3.0), (9, 0.5), (4, 2.5)):
+            storage.set_distance(agent_id, distance)
+        storage.set_information(2, {DataTypes.distance.value: {0: 3.0, 5: 6.0}})
+
+    sent = array_storage.get_data_to_send()[DataTypes.distance.value]
+
+    assert dict(sent) == dict_storage.get_data_to_send()[DataTypes.distance.value]
+    assert dict(array_storage.get_distances(2)) == {0: 3.0, 5: 6.0}
+    assert array_storage.size == 5
+
+
+def test_array_storage_keeps_the_triangulation_in_dictionaries():
+    storage = ArrayDistanceAndTriangulationStorage(1)
+    storage.set_information(1, {DataTypes.triangulation.value: {1: [0, 0], 2: [1, 0]}})
+
+    assert storage.get_data_to_send()[DataTypes.triangulation.value] == {1: [0, 0], 2: [1, 0]}
+
+
+def test_unknown_agents_have_no_distances():
+    storage = ArrayDistanceStorage(0)
+
+    assert len(storage.get_distances(42)) == 0
+    assert np.isnan(storage.distances[0, 0])
+
+
+def test_ttl_storage_drops_the_outdated_distances():
+    storage = DistanceOnlyTTLStorage(0, time_to_live=1.0, clock_frequency=0.25)
+    storage.set_distance(1, 2.0)
+
+    for _ in range(3):
+        storage.clock_tick()
+    storage.set_distance(2, 3.0)
+
+    for _ in range(2):
+        storage.clock_tick()
+
+    assert dict(storage.get_data_to_send()[DataTypes.distance.value]) == {2: 3.0}
+    assert len(storage.expiry) == 1
+
+
+def test_ttl_expiry_agrees_with_the_heap_for_fractional_clocks():
+    storage = DistanceOnlyTTLStorage(0, time_to_live=1.0, clock_frequency=0.1)
+
+    for _ in range(4):
+        storage.clock_tick()
+    storage.set_distance(1, 2.0)  # arrival at 0.4
+
+    for _ in range(10):
+        storage.clock_tick()  # age of 1.4000000000000001
+    storage.expire()
+
+    assert 1 not in storage.get_data_to_send()[DataTypes.distance.value]
+    assert len(storage.expiry) == 0
+
+
+def test_ttl_storage_keeps_refreshed_distances():
+    storage = DistanceOnlyTTLStorage(0, time_to_live=1.0, clock_frequency=0.5)
+    storage.set_distance(1, 2.0)
+
+    storage.clock_tick()
+    storage.set_distance(1, 2.5)
+
+    for _ in range(3):
+        storage.clock_tick()
+    assert storage.get_data_to_send()[DataTypes.distance.value] == {}
+
+    storage.set_distance(1, 3.0)
+    storage.clock_tick()
+    assert storage.get_data_to_send()[DataTypes.distance.value] == {1: 3.0}
+
+
+def test_ttl_storage_ages_relayed_data_by_their_relative_age():
+    storage = DistanceAndTriangulationTTLStorage(0, time_to_live=1.0, clock_frequency=0.5)
+    storage.set_information(1, {
+        DataTypes.distance.value: {2: 1.0, 3: 2.0},
+        DataTypes.triangulation.value: {1: [0, 0]},
+        DataTypes.age.value: {DataTypes.distance.value: {2: 0.75, 3: 0.0}, DataTypes.triangulation.value: 1.5},
+    })
+
+    storage.clock_tick()
+    storage.expire()
+
+    assert storage.data[DataTypes.distance.value][1] == {3: 2.0}
+    assert 1 not in storage.data.get(DataTypes.triangulation.value, {})
+
+
+def test_measured_distances_are_versioned_by_the_clock():
+    storage = ArrayDistanceStorage(0)
+    storage.set_distance(1, 2.0)
+    storage.set_information(1, {DataTypes.distance.value: DistanceRow([0], [2.0], [7]), DataTypes.clock.value: 7})
+    storage.set_distance(2, 3.0)
+
+    sent = storage.get_data_to_send()
+
+    assert sent[DataTypes.clock.value] == 8
+    assert sent[DataTypes.distance.value].versions.tolist() == [1, 8]
+
+
+def test_stale_gossip_never_overwrites_fresher_distances():
+    storage = ArrayDistanceStorage(0)
+
+    storage.set_information(1, {DataTypes.distance.value: DistanceRow([2, 3], [1.0, 2.0], [5, 5])})
+    storage.set_information(1, {DataTypes.distance.value: DistanceRow([2, 3], [1.5, 7.0], [3, 6])})
+
+    assert dict(storage.get_distances(1)) == {2: 1.0, 3: 7.0}
+    assert storage.get_distances(1).versions.tolist() == [5, 6]
+
+
+def test_agent_index_grows_the_arrays_before_indexing_new_agents():
+    sizes = []
+    index = AgentIndex(grow=lambda capacity: sizes.append((index.size, capacity)))
+
+    assert index.register([5, 2, 5]).tolist() == [0, 1, 0]
+    assert index.register([9, 2, 0]).tolist() == [2, 1, 3]
+
+    assert index.ids[:index.size].tolist() == [5, 2, 9, 0]
+    assert index.get([0, 7, 100]).tolist() == [3, -1, -1]
+    assert sizes == [(0, 2), (2, 4)]
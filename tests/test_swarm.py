@@ -0,0 +1,72 @@
+import random
+
+import numpy as np
+
+from src.modules.movement.simple import walk_forward, walk_forward_batch, random_walk_batch
+from src.simulation.agent import Agent
+from src.simulation.arena import RectangleArena
+from src.simulation.swarm import SwarmState
+
+
+def make_agents(count, seed=0):
+    random.seed(seed)
+    return [Agent(i, random.uniform(0, 50), random.uniform(0, 50), agents_speed=0.5) for i in range(count)]
+
+
+def test_agents_become_views_of_the_swarm_rows():
+    agents = make_agents(5)
+    positions = [(agent.x, agent.y) for agent in agents]
+
+    state = SwarmState.from_agents(agents)
+
+    assert len(state) == 5
+    assert state.positions.tolist() == [list(position) for position in positions]
+
+    agents[2].x = 12.5
+    state.positions[3, 1] = 7.5
+
+    assert state.positions[2, 0] == 12.5
+    assert agents[3].y == 7.5
+
+
+def test_batched_walk_forward_matches_the_agent_movement():
+    agents = make_agents(10)
+    expected = make_agents(10)
+    state = SwarmState.from_agents(agents)
+
+    for _ in range(20):
+        walk_forward_batch(state, np.arange(len(agents)))
+        for agent in expected:
+            walk_forward(agent)
+
+    assert np.allclose(state.positions, [(agent.x, agent.y) for agent in expected])
+
+
+def test_batched_random_walk_only_moves_the_given_rows():
+    agents = make_agents(6)
+    state = SwarmState.from_agents(agents)
+    before = state.positions.copy()
+
+    np.random.seed(0)
+    random_walk_batch(state, np.array([1, 4]))
+
+    assert np.array_equal(state.positions[[0, 2, 3, 5]], before[[0, 2, 3, 5]])
+    assert not np.array_equal(state.positions[[1, 4]], before[[1, 4]])
+
+
+def test_batched_wall_collisions_match_the_agent_collisions():
+    arena = RectangleArena(xlim=50, ylim=50, width=50, height=50)
+
+    for seed in range(50):
+        agents, expected = make_agents(20, seed=seed), make_agents(20, seed=seed)
+        for agent, other in zip(agents, expected):
+            agent.x, agent.y = other.x, other.y = random.uniform(-2, 52), random.uniform(-2, 52)
+            agent.dx, agent.dy = other.dx, other.dy
+
+        state = SwarmState.from_agents(agents)
+        arena.collide_batch(state, np.arange(len(agents)))
+
+        for agent in expected:
+            arena.collide(agent)
+
+        assert state.headings.tolist() == [[agent.dx, agent.dy] for agent in expected]
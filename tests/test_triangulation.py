@@ -0,0 +1,275 @@
+import numpy as np
+
+from src.modules.storage.model import DataTypes, DistanceRow
+from src.modules.triangulation.alignment import procrustes
+from src.modules.triangulation.model import DistanceMatrixTriangulation
+from src.modules.triangulation.types.delaunay import DelaunayTriangulation, DelaunaySubTriangulation
+from src.modules.triangulation.types.landmark import LandmarkMDScaleTriangulation
+from src.modules.triangulation.types import mds
+from src.modules.triangulation.types.mds import MDScaleTriangulation
+from src.modules.triangulation.types.trilateration import TrilaterationTriangulation
+
+
+class MatrixTriangulation(DistanceMatrixTriangulation):
+    def update_triangulation(self):
+        return [], [], dict()
+
+
+def message(row):
+    return {DataTypes.distance.value: row}
+
+
+def test_fresher_distances_replace_the_stored_ones():
+    triangulation = MatrixTriangulation(0)
+
+    triangulation.update_information(1, 2.0, {**message(DistanceRow([2], [3.0], [5])), DataTypes.clock.value: 5})
+    triangulation.update_information(1, 2.0, {**message(DistanceRow([2], [4.0], [4])), DataTypes.clock.value: 5})
+
+    i, j = triangulation.id_to_index[1], triangulation.id_to_index[2]
+    assert triangulation.distance_matrix[i, j] == 3.0
+
+    triangulation.update_information(1, 2.0, {**message(DistanceRow([2], [4.0], [6])), DataTypes.clock.value: 6})
+
+    assert triangulation.distance_matrix[i, j] == triangulation.distance_matrix[j, i] == 4.0
+    assert triangulation.version_matrix[i, j] == 6
+
+
+def test_measured_distances_are_versioned_after_the_sender_clock():
+    triangulation = MatrixTriangulation(0)
+    triangulation.update_information(1, 2.0, {**message(DistanceRow([], [])), DataTypes.clock.value: 10})
+
+    assert triangulation.clock == 11
+    assert triangulation.version_matrix[0, triangulation.id_to_index[1]] == 11
+
+
+def test_unversioned_distances_always_replace_the_stored_ones():
+    triangulation = MatrixTriangulation(0)
+
+    triangulation.update_information(1, 2.0, message({2: 3.0, 3: 1.0}))
+    triangulation.update_information(1, 2.5, message({2: 3.5}))
+
+    matrix = triangulation.distance_matrix
+    index = triangulation.id_to_index
+
+    assert triangulation.index_to_id == [0, 1, 2, 3]
+    assert matrix[0, index[1]] == 2.5
+    assert matrix[index[1], index[2]] == 3.5
+    assert matrix[index[1], index[3]] == 1.0
+    assert np.array_equal(matrix, matrix.T)
+
+
+def feed(triangulation, positions, senders=None):
+    """Give the triangulation the distances measured by the senders (all the agents by default)"""
+    distances = np.linalg.norm(positions[:, np.newaxis] - positions[np.newaxis, :], axis=-1)
+    own = triangulation.agent_id
+
+    for sender in range(len(positions)) if senders is None else senders:
+        if sender != own:
+            row = {other: distances[sender, other] for other in range(len(positions)) if other != sender}
+            triangulation.update_information(sender, distances[own, sender], message(row))
+
+
+def embedding_error(triangulation, positions):
+    """:return: largest error of the distances between the agents triangulated"""
+    coordinates = np.column_stack((triangulation.tri_x, triangulation.tri_y))
+    expected = positions[triangulation.index_to_id]
+
+    return np.abs(
+        np.linalg.norm(coordinates[:, np.newaxis] - coordinates[np.newaxis, :], axis=-1)
+        - np.linalg.norm(expected[:, np.newaxis] - expected[np.newaxis, :], axis=-1)
+    ).max()
+
+
+def test_classical_mds_triangulation_is_exact():
+    positions = np.random.default_rng(0).uniform(0, 50, (20, 2))
+
+    triangulation = MDScaleTriangulation(0)
+    feed(triangulation, positions)
+    triangulation.update_triangulation()
+
+    assert len(triangulation.tri_x) == 20
+    assert embedding_error(triangulation, positions) < 1e-6
+
+    positions[3] += [1.0, -0.5]
+    feed(triangulation, positions, senders=[3])
+    triangulation.update_triangulation()
+
+    assert embedding_error(triangulation, positions) < 1e-6
+
+
+def test_warm_and_incremental_updates_follow_a_moving_agent():
+    positions = np.random.default_rng(1).uniform(0, 50, (30, 2))
+
+    warm = MDScaleTriangulation(0, warm_start=True, max_iterations=50)
+    incremental = MDScaleTriangulation(0, incremental=True, max_iterations=50)
+
+    for triangulation in (warm, incremental):
+        feed(triangulation, positions)
+        triangulation.update_triangulation()
+
+    positions[5] += [1.0, -0.5]
+
+    for triangulation in (warm, incremental):
+        feed(triangulation, positions, senders=[5])
+        triangulation.update_triangulation()
+        assert embedding_error(triangulation, positions) < 0.05
+
+    assert incremental.full_updates == 0
+    assert not incremental.changed_rows
+
+
+def test_landmark_mds_only_keeps_the_landmark_rows():
+    positions = np.random.default_rng(2).uniform(0, 50, (200, 2))
+
+    triangulation = LandmarkMDScaleTriangulation(0, landmarks=10)
+    feed(triangulation, positions)
+    triangulation.update_triangulation()
+
+    assert triangulation.landmark_rows.shape == (10, 200)
+    assert triangulation._rows.shape[0] == 10
+    assert triangulation.landmark_indices[0] == triangulation.id_to_index[0]
+    assert len(triangulation.tri_x) == 200
+    assert embedding_error(triangulation, positions) < 1e-6
+
+
+def test_landmark_mds_with_local_distances():
+    rng = np.random.default_rng(3)
+    positions = rng.uniform(0, 50, (150, 2))
+    distances = np.linalg.norm(positions[:, np.newaxis] - positions[np.newaxis, :], axis=-1)
+
+    triangulation = LandmarkMDScaleTriangulation(0, landmarks=15)
+    for sender in rng.permutation(np.arange(1, 150)):
+        near = np.flatnonzero((distances[sender] < 30) & (np.arange(150) != sender))
+        triangulation.update_information(sender, distances[0, sender], message(dict(zip(near, distances[sender, near]))))
+
+    triangulation.update_triangulation()
+
+    # Landmarks spread over the arena, and agents placed within a few centimeters
+    landmarks = positions[[triangulation.index_to_id[i] for i in triangulation.landmark_indices]]
+    assert np.ptp(landmarks, axis=0).min() > 30
+    assert embedding_error(triangulation, positions) < 0.5
+
+
+def test_landmark_distances_are_versioned():
+    triangulation = LandmarkMDScaleTriangulation(0, landmarks=3)
+
+    triangulation.update_information(1, 2.0, {**message(DistanceRow([2], [3.0], [5])), DataTypes.clock.value: 5})
+    triangulation.update_information(1, 2.0, {**message(DistanceRow([2], [4.0], [4])), DataTypes.clock.value: 5})
+
+    assert triangulation.landmark_rows[1, triangulation.id_to_index[2]] == 3.0
+
+
+def test_trilateration_is_exact_on_complete_distances():
+    positions = np.random.default_rng(4).uniform(0, 50, (100, 2))
+
+    triangulation = TrilaterationTriangulation(0)
+    feed(triangulation, positions)
+    x, y, points = triangulation.update_triangulation()
+
+    assert len(x) == len(points) == 100
+    assert points[0] == [0.0, 0.0]
+    assert embedding_error(triangulation, positions) < 1e-6
+
+
+def test_trilateration_leaves_out_agents_it_cannot_place():
+    positions = np.array([[0.0, 0.0], [3.0, 0.0], [0.0, 4.0], [3.0, 4.0], [20.0, 20.0]])
+
+    triangulation = TrilaterationTriangulation(0)
+    feed(triangulation, positions[:4])
+    triangulation.update_information(4, 0.0, message({1: 25.0}))  # only knows one agent
+    _, _, points = triangulation.update_triangulation()
+
+    assert sorted(points) == [0, 1, 2, 3]
+
+
+def test_trilateration_with_noisy_local_distances():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 50, (300, 2))
+
+    # Distances measured with 1 cm of noise, up to 15 m
+    noise = np.triu(rng.normal(0, 0.01, (300, 300)), k=1)
+    distances = np.linalg.norm(positions[:, np.newaxis] - positions[np.newaxis, :], axis=-1)
+    distances = np.where(distances <= 15, distances + noise + noise.T, 0.0)
+    np.fill_diagonal(distances, 0.0)
+
+    triangulation = TrilaterationTriangulation(0)
+    for sender in range(1, 300):
+        known = np.flatnonzero(distances[sender])
+        row = DistanceRow(known, distances[sender, known])
+        triangulation.update_information(sender, distances[0, sender], message(row))
+    _, _, points = triangulation.update_triangulation()
+
+    # Errors once aligned on the real positions, mirrored ones included
+    ids = list(points)
+    coordinates = np.array(list(points.values()))
+    rotation, translation, _ = procrustes(coordinates, positions[ids])
+    errors = np.linalg.norm(coordinates @ rotation + translation - positions[ids], axis=1)
+
+    assert len(ids) > 290
+    assert np.median(errors) < 0.05
+    assert errors.max() < 1.0
+
+
+def test_pruned_matrix_keeps_the_first_three_known_distances_of_each_row():
+    rng = np.random.default_rng(5)
+    triangulation = DelaunayTriangulation(0)
+
+    positions = rng.uniform(0, 50, (12, 2))
+    feed(triangulation, positions, senders=[1, 3, 4, 7])
+    matrix = triangulation.distance_matrix
+
+    # Baseline implementation
+    expected = np.zeros_like(matrix)
+    for i in range(len(matrix)):
+        count = 0
+        for j in range(i + 1, len(matrix)):
+            if matrix[i, j] > 0 and not count >= 3:
+                expected[i, j] = matrix[i, j]
+                count += 1
+            else:
+                expected[i, j] = -1
+
+    assert np.array_equal(triangulation._prune_distance_matrix(), expected)
+
+
+def test_delaunay_sub_triangulation_keeps_the_agent_at_the_origin():
+    positions = np.array([[0.0, 0.0], [4.0, 0.0], [0.0, 3.0], [4.0, 3.0], [2.0, 5.0]])
+
+    triangulation = DelaunaySubTriangulation(0, precision=0.1)
+    feed(triangulation, positions[:4])
+    triangulation.update_triangulation()
+
+    # The new triangulation no longer fits the previous one exactly
+    positions[1] = [5.0, 1.0]
+    feed(triangulation, positions)
+    x, y, points = triangulation.update_triangulation()
+
+    assert triangulation.previous_const[0] != [0.0, 0.0]
+    assert points[0] == [0.0, 0.0]
+    assert (x[0], y[0]) == (0.0, 0.0)
+    assert embedding_error(triangulation, positions) < 0.1
+
+
+def test_distances_received_during_an_update_are_kept_for_the_next_one(monkeypatch):
+    positions = np.random.default_rng(4).uniform(0, 50, (20, 2))
+
+    triangulation = MDScaleTriangulation(0, incremental=True)
+    feed(triangulation, positions)
+    triangulation.update_triangulation()
+
+    # Another thread receiving distances while the triangulation is computed
+    stress_majorization = mds.stress_majorization
+
+    def receive_during_update(*args, **kwargs):
+        positions[7] += [0.5, 0.5]
+        feed(triangulation, positions, senders=[7])
+        return stress_majorization(*args, **kwargs)
+
+    monkeypatch.setattr(mds, "stress_majorization", receive_during_update)
+
+    positions[3] += [1.0, -0.5]
+    feed(triangulation, positions, senders=[3])
+    triangulation.update_triangulation()
+
+    assert triangulation.id_to_index[7] in triangulation.changed_rows
+    assert triangulation.id_to_index[3] not in triangulation.changed_rows